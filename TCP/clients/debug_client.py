@@ -3,24 +3,32 @@ Debug client — developer-only tool to read any device directly.
 
 NOT for mentor demo. Reads PCS/BMS registers directly by port.
 
-Usage:
-  python debug_client.py --host 127.0.0.1 --port 15021 --read-ir 0 3
-  python debug_client.py --host 127.0.0.1 --port 15024 --read-ir 0 3
-  python debug_client.py --host 127.0.0.1 --port 15020 --read-hr 0 1
-  python debug_client.py --host 127.0.0.1 --port 15020 --write-hr 0 1000
+Usage (from TCP/):
+  python -m clients.debug_client --host 127.0.0.1 --port 15021 --read-ir 0 3
+  python -m clients.debug_client --host 127.0.0.1 --port 15024 --read-ir 0 3
+  python -m clients.debug_client --host 127.0.0.1 --port 15020 --read-hr 0 1
+  python -m clients.debug_client --host 127.0.0.1 --port 15020 --write-hr 0 1000
 """
 
 from __future__ import annotations
 
 import argparse
-import sys
-import os
+from array import array
+from typing import List
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tcp_servers"))
-
-from pymodbus.client import ModbusTcpClient
 from tcp_servers.tcp_context import decode_power_kw
+from tcp_servers.tcp_utils import make_nodelay_client
+
+
+def _format_registers(addr: int, registers: List[int]) -> str:
+    """One line per register: raw / u16 / i16 / power_kw (I16 gain=10)."""
+    raw = array("H", registers)
+    signed = array("h", raw.tobytes())  # reinterpret u16 → i16 in one pass
+    return "\n".join(
+        f"  [{addr+i}] raw=0x{v:04X}  u16={v}  i16={sv}  "
+        f"power_kw={decode_power_kw(v):.1f}"
+        for i, (v, sv) in enumerate(zip(raw, signed))
+    )
 
 
 def main() -> None:
@@ -36,7 +44,7 @@ def main() -> None:
                         help="Write single holding register: addr value_u16")
 
     args = parser.parse_args()
-    client = ModbusTcpClient(args.host, port=args.port)
+    client = make_nodelay_client(args.host, args.port)
     client.connect()
 
     if args.read_hr:
@@ -46,10 +54,7 @@ def main() -> None:
             print(f"Error: {rr}")
         else:
             print(f"HR[{addr}..{addr+count-1}] = {rr.registers}")
-            for i, v in enumerate(rr.registers):
-                signed = v - 0x10000 if v >= 0x8000 else v
-                print(f"  [{addr+i}] raw=0x{v:04X}  u16={v}  i16={signed}  "
-                      f"power_kw={signed*0.1:.1f}")
+            print(_format_registers(addr, rr.registers))
 
     if args.read_ir:
         addr, count = args.read_ir
@@ -58,10 +63,7 @@ def main() -> None:
             print(f"Error: {rr}")
         else:
             print(f"IR[{addr}..{addr+count-1}] = {rr.registers}")
-            for i, v in enumerate(rr.registers):
-                signed = v - 0x10000 if v >= 0x8000 else v
-                print(f"  [{addr+i}] raw=0x{v:04X}  u16={v}  i16={signed}  "
-                      f"power_kw={signed*0.1:.1f}")
+            print(_format_registers(addr, rr.registers))
 
     if args.write_hr:
         addr, value = args.write_hr
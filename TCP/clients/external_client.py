@@ -1,31 +1,26 @@
 """
 External client — talks ONLY to PMS (TCP) and Multimeter (RTU).
 
-Usage:
+Usage (from TCP/):
   # Write demand to PMS
-  python external_client.py --pms-host 127.0.0.1 --pms-port 15020 --set-kw 1000
+  python -m clients.external_client --pms-host 127.0.0.1 --pms-port 15020 --set-kw 1000
 
   # Read PMS aggregates
-  python external_client.py --pms-host 127.0.0.1 --pms-port 15020 --read-pms
+  python -m clients.external_client --pms-host 127.0.0.1 --pms-port 15020 --read-pms
 
   # Read multimeter via RTU
-  python external_client.py --rtu-com COM11 --read-multimeter
+  python -m clients.external_client --rtu-com COM11 --read-multimeter
 
   # Combined: set demand + read PMS + read multimeter
-  python external_client.py --pms-host 127.0.0.1 --pms-port 15020 --set-kw 1000 --read-pms --rtu-com COM11 --read-multimeter
+  python -m clients.external_client --pms-host 127.0.0.1 --pms-port 15020 --set-kw 1000 --read-pms --rtu-com COM11 --read-multimeter
 """
 
 from __future__ import annotations
 
 import argparse
-import sys
-import os
 import time
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tcp_servers"))
-
-from pymodbus.client import ModbusTcpClient, ModbusSerialClient
+from pymodbus.client import ModbusSerialClient
 
 from tcp_servers.tcp_context import (
     encode_power_kw,
@@ -34,6 +29,7 @@ from tcp_servers.tcp_context import (
     decode_soh,
     decode_capacity_kwh,
 )
+from tcp_servers.tcp_utils import make_nodelay_client
 
 # PMS register addresses (0-based)
 PMS_HR0_DEMAND = 0
@@ -48,7 +44,7 @@ MM_IR0_ACTIVE_POWER = 0
 
 def write_pms_demand(host: str, port: int, kw: float) -> None:
     """Write demand_control_power to PMS HR0."""
-    client = ModbusTcpClient(host, port=port)
+    client = make_nodelay_client(host, port)
     client.connect()
     u16 = encode_power_kw(kw)
     rr = client.write_register(PMS_HR0_DEMAND, u16, device_id=0)
@@ -61,7 +57,7 @@ def write_pms_demand(host: str, port: int, kw: float) -> None:
 
 def read_pms(host: str, port: int) -> None:
     """Read PMS HR0 + IR0..IR3 and display."""
-    client = ModbusTcpClient(host, port=port)
+    client = make_nodelay_client(host, port)
     client.connect()
 
     # HR0 demand
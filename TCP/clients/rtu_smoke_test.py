@@ -2,15 +2,12 @@ from __future__ import annotations
 
 import argparse
 import sys
-import os
 import time
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tcp_servers"))
-
-from pymodbus.client import ModbusTcpClient, ModbusSerialClient
+from pymodbus.client import ModbusSerialClient
 from tcp_servers.tcp_context import decode_power_kw
-from register_codec import decode_i32
+from tcp_servers.tcp_utils import make_nodelay_client
+from tcp_servers.register_codec import decode_i32
 
 DEFAULT_HOST = "127.0.0.1"
 PCS1_PORT = 15021
@@ -23,7 +20,7 @@ TOLERANCE_KW = 0.2
 
 
 def read_pcs_ir0(host: str, port: int) -> float:
-    client = ModbusTcpClient(host, port=port)
+    client = make_nodelay_client(host, port)
     client.connect()
     rr = client.read_input_registers(32080, count=2, device_id=0)
     client.close()
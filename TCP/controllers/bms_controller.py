@@ -1,11 +1,14 @@
 """
 BMS controller — runs inside each BMS server process.
 
-Every tick:
-1. Read paired PCS IR 32080-32081 (active_power, I32, gain=1000) via Modbus TCP.
+A reader task polls paired PCS IR 32080-32081 (active_power, I32,
+gain=1000) over a persistent Modbus TCP connection and keeps the latest
+value.  Independently, every tick:
+1. Take the latest PCS active_power.
 2. Update float SOC accumulator:
      soc_float += -(active_power_kw * dt_s) / (capacity_kwh * 3600) * 100
-   Clamp [0, 100].
+   Clamp [0, 100].  dt_s is the nominal tick interval (wall-clock dt
+   is opt-in via use_wall_clock_dt).
 3. Write own Huawei registers:
    - IR 30035 (container_soc, U16, gain=1)
    - IR 30105 (bcu1_soc, U16, gain=1)
@@ -20,18 +23,15 @@ Sign convention:
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import threading
 import time
 from typing import Dict, Tuple
 
-from pymodbus.client import ModbusTcpClient
-
-import sys, os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tcp_servers"))
-
-from register_codec import encode_i32, encode_u16, decode_i32
+from tcp_servers.fast_modbus import FastModbusClient
+from tcp_servers.register_codec import encode_i32, encode_u16, decode_i32
+from tcp_servers.tcp_utils import next_deadline as _next_deadline
 
 log = logging.getLogger("bms_controller")
 
@@ -71,82 +71,159 @@ def _compute_alarm(soc: float) -> int:
     return alarm
 
 
-def _loop(
+async def _pcs_reader(
     device_name: str,
+    pcs_client: FastModbusClient,
+    latest: Dict[str, float],
+    poll_interval_s: float,
+    stop_event,  # threading.Event or asyncio.Event
+) -> None:
+    """Poll the paired PCS active_power and publish it into latest["active_power_kw"].
+
+    Any failed read (I/O error or Modbus exception response) publishes 0,
+    so the integrator never keeps integrating a stale power.
+    """
+    while not stop_event.is_set():
+        try:
+            regs = await pcs_client.read_input_registers(PCS_IR_ACTIVE_POWER, 2)
+        except Exception:
+            pcs_client.close()  # next poll reconnects
+            regs = None
+            log.warning("%s: cannot read PCS active_power, assuming 0", device_name)
+        else:
+            if regs is None:
+                log.warning("%s: PCS active_power read got an exception response, "
+                            "assuming 0", device_name)
+        latest["active_power_kw"] = (
+            0.0 if regs is None else decode_i32(regs, gain=PCS_GAIN_POWER))
+        await asyncio.sleep(poll_interval_s)
+
+
+async def _integrator(
     stores: Dict[str, object],
-    lock: threading.RLock,
-    paired_pcs_host: str,
-    paired_pcs_port: int,
+    latest: Dict[str, float],
     tick_interval_s: float,
-    stop_event: threading.Event,
+    stop_event,  # threading.Event or asyncio.Event
     init_soc: float,
     capacity_kwh: float,
+    use_wall_clock_dt: bool = False,
 ) -> None:
-    log.info(f"{device_name} controller loop started (soc_init={init_soc}%)")
+    """Integrate SOC from the latest PCS power and write own registers every tick.
 
+    dt is the nominal tick_interval_s, which keeps the SOC trajectory
+    reproducible; use_wall_clock_dt measures it with time.monotonic()
+    instead, absorbing scheduling jitter into the integral.
+    """
     soc_float = init_soc
-    last_time = time.monotonic()
+    dt_s = tick_interval_s
+    # %SOC per kW·s: capacity is fixed for the controller's lifetime, so the
+    # divide is folded once here; 0 without capacity, so SOC then stays put
+    soc_per_kws = 100.0 / (capacity_kwh * 3600) if capacity_kwh > 0 else 0.0
+    ir_set = stores["ir"].setValues  # bound once for the tick loop
+    # (rounded SOC, power) last written: every register below derives from
+    # these two, and only this task writes them, so an equal pair means the
+    # datastore is already current
+    last_written = None
+    next_deadline = time.monotonic() + tick_interval_s
+    last_time = time.monotonic() if use_wall_clock_dt else 0.0
 
     while not stop_event.is_set():
-        now = time.monotonic()
-        dt_s = now - last_time
-        last_time = now
+        if use_wall_clock_dt:
+            now = time.monotonic()
+            dt_s = now - last_time
+            last_time = now
 
-        # 1) Read PCS active_power via Modbus TCP (I32 at IR 32080-32081)
-        active_power_kw = 0.0
-        try:
-            pcs_client = ModbusTcpClient(paired_pcs_host, port=paired_pcs_port)
-            pcs_client.connect()
-            rr = pcs_client.read_input_registers(PCS_IR_ACTIVE_POWER, count=2, device_id=0)
-            if not rr.isError():
-                active_power_kw = decode_i32(list(rr.registers), gain=PCS_GAIN_POWER)
-            pcs_client.close()
-        except Exception:
-            log.warning(f"{device_name}: cannot read PCS active_power, assuming 0")
+        # 1) Latest PCS active_power published by the reader task
+        active_power_kw = latest["active_power_kw"]
 
         # 2) SOC update
-        if capacity_kwh > 0:
-            delta_soc = -(active_power_kw * dt_s) / (capacity_kwh * 3600) * 100.0
-            soc_float = max(0.0, min(100.0, soc_float + delta_soc))
+        if soc_per_kws:
+            soc_float = max(0.0, min(100.0, soc_float - active_power_kw * dt_s * soc_per_kws))
 
-        # 3) Write Huawei registers
-        alarm = _compute_alarm(soc_float)
-        soc_u16 = encode_u16(round(soc_float))[0]  # U16, gain=1
+        # 3) Write Huawei registers (skipped while nothing they show changed)
+        soc_r = round(soc_float)
+        if (soc_r, active_power_kw) != last_written:
+            last_written = (soc_r, active_power_kw)
+            alarm = _compute_alarm(soc_float)
+            soc_u16 = encode_u16(soc_r)[0]  # U16, gain=1
 
-        with lock:
-            ir = stores["ir"]
             # Container SOC (30035)
-            ir.setValues(ADDR_CONTAINER_SOC, [soc_u16])
+            ir_set(ADDR_CONTAINER_SOC, [soc_u16])
             # BCU-1 SOC (30105) + SOH (30106)
-            ir.setValues(ADDR_BCU1_SOC, [soc_u16])
+            ir_set(ADDR_BCU1_SOC, [soc_u16])
             # BCU-1 charge/discharge power (30107-30108, I32, gain=1000)
-            ir.setValues(ADDR_BCU1_CHG_DIS_P, encode_i32(active_power_kw, gain=1000))
+            ir_set(ADDR_BCU1_CHG_DIS_P, encode_i32(active_power_kw, gain=1000))
             # Container charge/discharge power (30056-30057, I32, gain=10)
-            ir.setValues(ADDR_CHG_DIS_POWER, encode_i32(active_power_kw, gain=10))
+            ir_set(ADDR_CHG_DIS_POWER, encode_i32(active_power_kw, gain=10))
             # Subsystem alarm (39014)
-            ir.setValues(ADDR_TELE_ALARM_1, [alarm])
+            ir_set(ADDR_TELE_ALARM_1, [alarm])
 
-        stop_event.wait(tick_interval_s)
+        sleep_s, next_deadline = _next_deadline(next_deadline, tick_interval_s)
+        await asyncio.sleep(sleep_s)
 
-        stop_event.wait(tick_interval_s)
+
+async def _async_loop(
+    device_name, stores, paired_pcs_host, paired_pcs_port,
+    tick_interval_s, stop_event, init_soc, capacity_kwh,
+    use_wall_clock_dt=False,
+):
+    log.info("%s controller loop started (soc_init=%s%%)", device_name, init_soc)
+
+    # The PCS reader and the SOC integrator run as two tasks, so network
+    # latency never stretches a SOC tick.
+    # Persistent client to the paired PCS (reconnected lazily on error)
+    pcs_client = FastModbusClient(paired_pcs_host, paired_pcs_port)
+    latest = {"active_power_kw": 0.0}  # written by reader, read by integrator
+
+    try:
+        await asyncio.gather(
+            _pcs_reader(device_name, pcs_client, latest, tick_interval_s, stop_event),
+            _integrator(stores, latest, tick_interval_s, stop_event, init_soc, capacity_kwh,
+                        use_wall_clock_dt),
+        )
+    finally:
+        pcs_client.close()
+
+
+def start_bms_controller_async(
+    *,
+    device_name: str,
+    stores: Dict[str, object],
+    paired_pcs_host: str,
+    paired_pcs_port: int,
+    tick_interval_s: float,
+    init_soc: float = 50.0,
+    capacity_kwh: float = 100.0,
+    use_wall_clock_dt: bool = False,
+) -> Tuple[asyncio.Task, asyncio.Event]:
+    """Schedule the controller as a task on the running event loop."""
+    stop_event = asyncio.Event()
+    task = asyncio.get_running_loop().create_task(_async_loop(
+        device_name, stores, paired_pcs_host, paired_pcs_port,
+        tick_interval_s, stop_event, init_soc, capacity_kwh,
+        use_wall_clock_dt,
+    ))
+    return task, stop_event
 
 
 def start_bms_controller(
     *,
     device_name: str,
     stores: Dict[str, object],
-    lock: threading.RLock,
     paired_pcs_host: str,
     paired_pcs_port: int,
     tick_interval_s: float,
     init_soc: float = 50.0,
     capacity_kwh: float = 100.0,
+    use_wall_clock_dt: bool = False,
 ) -> Tuple[threading.Thread, threading.Event]:
+    """Run the controller on its own thread and event loop."""
     stop_event = threading.Event()
     t = threading.Thread(
-        target=_loop,
-        args=(device_name, stores, lock, paired_pcs_host, paired_pcs_port,
-              tick_interval_s, stop_event, init_soc, capacity_kwh),
+        target=asyncio.run,
+        args=(_async_loop(device_name, stores, paired_pcs_host, paired_pcs_port,
+                          tick_interval_s, stop_event, init_soc, capacity_kwh,
+                          use_wall_clock_dt),),
         daemon=True,
     )
     t.start()
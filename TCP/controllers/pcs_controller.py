@@ -28,21 +28,18 @@ Every tick:
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import math
 import random
 import threading
 import time
-from typing import Dict, Optional, Tuple
-
-from pymodbus.client import ModbusTcpClient
-
-import sys, os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tcp_servers"))
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
+from tcp_servers.fast_modbus import FastModbusClient
 from tcp_servers.tcp_context import decode_soc
-from register_codec import encode_i32, encode_i16, encode_u16, encode_u32, decode_i32
+from tcp_servers.register_codec import encode_i32, encode_i16, encode_u16, encode_u32, decode_i32
+from tcp_servers.tcp_utils import next_deadline as _next_deadline
 
 log = logging.getLogger("pcs_controller")
 
@@ -104,64 +101,59 @@ DEVICE_STATUS_STANDBY    = 0x0000  # standby: initializing
 DEVICE_STATUS_PQ_RUNNING = 0x0206  # runs: PQ running
 
 
-def _read_bms_soc_soh(host: str, port: int) -> Tuple[float, float]:
+async def _read_bms_soc_soh(c: FastModbusClient) -> Tuple[float, float]:
     """Read SOC and SOH from paired BMS — Huawei BCU-1 (30105-30106)."""
     soc, soh = 50.0, 100.0  # fallback
     try:
-        c = ModbusTcpClient(host, port=port)
-        c.connect()
-        rr = c.read_input_registers(BMS_IR_BCU1_SOC, count=2, device_id=0)
-        if not rr.isError() and len(rr.registers) >= 2:
-            soc = float(rr.registers[0])   # BCU-1 SOC, U16, gain=1, %
-            soh = float(rr.registers[1])   # BCU-1 SOH, U16, gain=1, %
-        c.close()
+        regs = await c.read_input_registers(BMS_IR_BCU1_SOC, 2)
+        if regs is not None:
+            soc = float(regs[0])   # BCU-1 SOC, U16, gain=1, %
+            soh = float(regs[1])   # BCU-1 SOH, U16, gain=1, %
     except Exception:
-        pass
+        c.close()  # reconnect on next tick
     return soc, soh
 
 
-def _read_transducer_freq(host: str, port: int) -> Optional[float]:
+async def _read_transducer_freq(c: FastModbusClient) -> Optional[float]:
     """Read frequency from Transducer IR0 (uint16, gain=1000, Hz)."""
     try:
-        c = ModbusTcpClient(host, port=port)
-        c.connect()
-        rr = c.read_input_registers(0, count=1, device_id=0)
-        c.close()
-        if not rr.isError() and rr.registers[0] > 0:
-            return rr.registers[0] / 1000.0  # e.g. 50000 → 50.0
+        regs = await c.read_input_registers(0, 1)
+        if regs is not None and regs[0] > 0:
+            return regs[0] / 1000.0  # e.g. 50000 → 50.0
     except Exception:
-        pass
+        c.close()  # reconnect on next tick
     return None
 
 
-def _tick(
+async def _tick(
     device_name: str,
-    stores: Dict[str, object],
-    lock: threading.RLock,
-    paired_bms_host: str,
-    paired_bms_port: int,
-    transducer_host: Optional[str],
-    transducer_port: Optional[int],
+    hr_get: Callable[[int, int], Sequence[int]],
+    ir_set: Callable[[int, List[int]], None],
+    bms_client: FastModbusClient,
+    transducer_client: Optional[FastModbusClient],
     peak_power_kw: list,  # mutable container [float] to track peak
 ) -> None:
-    """One tick of the PCS controller."""
+    """One tick of the PCS controller.
+
+    hr_get / ir_set are the datastore's getValues / setValues, bound once
+    by the loop so the tick body does no per-call dict or attribute lookup.
+    """
 
     # ── 1) Read own setpoint from HR 40043-40044 ──────────────────────────
-    with lock:
-        regs = stores["hr"].getValues(HR_FIXED_ACTIVE_P, 2)
+    regs = hr_get(HR_FIXED_ACTIVE_P, 2)
     setpoint_kw = decode_i32(list(regs), gain=GAIN_POWER)
 
     # ── 2) Read paired BMS SOC + SOH ──────────────────────────────────────
-    soc, soh = _read_bms_soc_soh(paired_bms_host, paired_bms_port)
+    soc, soh = await _read_bms_soc_soh(bms_client)
 
     # ── 3) Clamp by SOC ──────────────────────────────────────────────────
     active_power_kw = setpoint_kw
     if soc <= 0.0 and setpoint_kw > 0.0:
         active_power_kw = 0.0
-        log.info(f"{device_name}: SOC=0, clamping discharge to 0")
+        log.info("%s: SOC=0, clamping discharge to 0", device_name)
     elif soc >= 100.0 and setpoint_kw < 0.0:
         active_power_kw = 0.0
-        log.info(f"{device_name}: SOC=100, clamping charge to 0")
+        log.info("%s: SOC=100, clamping charge to 0", device_name)
 
     # ── 4) Derive all power-block registers ───────────────────────────────
     is_active = abs(active_power_kw) > 0.01
@@ -205,8 +197,8 @@ def _tick(
 
     # Grid frequency: read from Transducer if available, else 50.0 Hz
     grid_freq_hz = 50.0
-    if transducer_host and transducer_port:
-        freq = _read_transducer_freq(transducer_host, transducer_port)
+    if transducer_client is not None:
+        freq = await _read_transducer_freq(transducer_client)
         if freq is not None:
             grid_freq_hz = freq
 
@@ -218,74 +210,107 @@ def _tick(
     device_status = DEVICE_STATUS_PQ_RUNNING if is_active else DEVICE_STATUS_STANDBY
 
     # ── 5) Write all IR registers ─────────────────────────────────────────
-    with lock:
-        ir = stores["ir"]
-
-        # Running status (32000)
-        ir.setValues(IR_RUNNING_STATUS, [STATUS_GRID_CONNECTED])
-
-        # Power block (32064-32090)
-        ir.setValues(IR_DC_POWER,       encode_i32(dc_power_kw, gain=1000))
-        ir.setValues(IR_LINE_VOLT_AB,   encode_u16(line_volt_v, gain=10))
-        ir.setValues(IR_LINE_VOLT_BC,   encode_u16(line_volt_v, gain=10))
-        ir.setValues(IR_LINE_VOLT_CA,   encode_u16(line_volt_v, gain=10))
-        ir.setValues(IR_PHASE_VOLT_A,   encode_u16(phase_volt_v, gain=10))
-        ir.setValues(IR_PHASE_VOLT_B,   encode_u16(phase_volt_v, gain=10))
-        ir.setValues(IR_PHASE_VOLT_C,   encode_u16(phase_volt_v, gain=10))
-        ir.setValues(IR_PHASE_CURR_A,   encode_i32(phase_current_a, gain=1000))
-        ir.setValues(IR_PHASE_CURR_B,   encode_i32(phase_current_a, gain=1000))
-        ir.setValues(IR_PHASE_CURR_C,   encode_i32(phase_current_a, gain=1000))
-        ir.setValues(IR_PEAK_ACTIVE_P,  encode_i32(peak_power_kw[0], gain=1000))
-        ir.setValues(IR_ACTIVE_POWER,   encode_i32(active_power_kw, gain=1000))
-        ir.setValues(IR_REACTIVE_POWER, encode_i32(reactive_power_kvar, gain=1000))
-        ir.setValues(IR_POWER_FACTOR,   encode_i16(power_factor, gain=1000))
-        ir.setValues(IR_GRID_FREQUENCY, encode_u16(grid_freq_hz, gain=100))
-        ir.setValues(IR_EFFICIENCY,     encode_u16(efficiency_pct, gain=100))
-        ir.setValues(IR_INTERNAL_TEMP,  encode_i16(temp_c, gain=10))
-        ir.setValues(IR_INSULATION_RES, encode_u16(NOMINAL_INSULATION_MOHM, gain=1000))
-        ir.setValues(IR_DEVICE_STATUS,  [device_status])
-        ir.setValues(IR_ERROR_CODE,     [0])
-
-        # Battery cluster (32463-32468) — mirror from BMS
-        ir.setValues(IR_BATT_SOC,  encode_u16(soc, gain=10))
-        ir.setValues(IR_BATT_SOH,  encode_u16(soh, gain=10))
-        ir.setValues(IR_RATED_AH,  encode_u32(RATED_CAPACITY_AH, gain=1000))
-        ir.setValues(IR_RATED_KWH, encode_u32(RATED_CAPACITY_KWH, gain=1000))
-
-
-def _loop(
-    device_name, stores, lock, paired_bms_host, paired_bms_port,
+    # Running status (32000)
+    ir_set(IR_RUNNING_STATUS, [STATUS_GRID_CONNECTED])
+
+    # Power block (32064-32090)
+    ir_set(IR_DC_POWER,       encode_i32(dc_power_kw, gain=1000))
+    ir_set(IR_LINE_VOLT_AB,   encode_u16(line_volt_v, gain=10))
+    ir_set(IR_LINE_VOLT_BC,   encode_u16(line_volt_v, gain=10))
+    ir_set(IR_LINE_VOLT_CA,   encode_u16(line_volt_v, gain=10))
+    ir_set(IR_PHASE_VOLT_A,   encode_u16(phase_volt_v, gain=10))
+    ir_set(IR_PHASE_VOLT_B,   encode_u16(phase_volt_v, gain=10))
+    ir_set(IR_PHASE_VOLT_C,   encode_u16(phase_volt_v, gain=10))
+    ir_set(IR_PHASE_CURR_A,   encode_i32(phase_current_a, gain=1000))
+    ir_set(IR_PHASE_CURR_B,   encode_i32(phase_current_a, gain=1000))
+    ir_set(IR_PHASE_CURR_C,   encode_i32(phase_current_a, gain=1000))
+    ir_set(IR_PEAK_ACTIVE_P,  encode_i32(peak_power_kw[0], gain=1000))
+    ir_set(IR_ACTIVE_POWER,   encode_i32(active_power_kw, gain=1000))
+    ir_set(IR_REACTIVE_POWER, encode_i32(reactive_power_kvar, gain=1000))
+    ir_set(IR_POWER_FACTOR,   encode_i16(power_factor, gain=1000))
+    ir_set(IR_GRID_FREQUENCY, encode_u16(grid_freq_hz, gain=100))
+    ir_set(IR_EFFICIENCY,     encode_u16(efficiency_pct, gain=100))
+    ir_set(IR_INTERNAL_TEMP,  encode_i16(temp_c, gain=10))
+    ir_set(IR_INSULATION_RES, encode_u16(NOMINAL_INSULATION_MOHM, gain=1000))
+    ir_set(IR_DEVICE_STATUS,  [device_status])
+    ir_set(IR_ERROR_CODE,     [0])
+
+    # Battery cluster (32463-32468) — mirror from BMS
+    ir_set(IR_BATT_SOC,  encode_u16(soc, gain=10))
+    ir_set(IR_BATT_SOH,  encode_u16(soh, gain=10))
+    ir_set(IR_RATED_AH,  encode_u32(RATED_CAPACITY_AH, gain=1000))
+    ir_set(IR_RATED_KWH, encode_u32(RATED_CAPACITY_KWH, gain=1000))
+
+
+async def _async_loop(
+    device_name, stores, paired_bms_host, paired_bms_port,
     transducer_host, transducer_port,
     tick_interval_s, stop_event,
 ):
-    log.info(f"{device_name} controller loop started")
+    log.info("%s controller loop started", device_name)
     peak_power_kw = [0.0]  # mutable container for peak tracking
-    while not stop_event.is_set():
-        try:
-            _tick(device_name, stores, lock, paired_bms_host, paired_bms_port,
-                  transducer_host, transducer_port, peak_power_kw)
-        except Exception:
-            log.exception(f"{device_name} controller tick error")
-        stop_event.wait(tick_interval_s)
+    hr_get = stores["hr"].getValues
+    ir_set = stores["ir"].setValues
+
+    # Persistent clients, reused across ticks (reconnected lazily on error)
+    bms_client = FastModbusClient(paired_bms_host, paired_bms_port)
+    transducer_client = None
+    if transducer_host and transducer_port:
+        transducer_client = FastModbusClient(transducer_host, transducer_port)
+
+    next_deadline = time.monotonic() + tick_interval_s
+    try:
+        while not stop_event.is_set():
+            try:
+                await _tick(device_name, hr_get, ir_set, bms_client, transducer_client,
+                            peak_power_kw)
+            except Exception:
+                log.exception("%s controller tick error", device_name)
+            sleep_s, next_deadline = _next_deadline(next_deadline, tick_interval_s)
+            await asyncio.sleep(sleep_s)
+    finally:
+        bms_client.close()
+        if transducer_client is not None:
+            transducer_client.close()
+
+
+def start_pcs_controller_async(
+    *,
+    device_name: str,
+    stores: Dict[str, object],
+    paired_bms_host: str,
+    paired_bms_port: int,
+    transducer_host: str = "",
+    transducer_port: int = 0,
+    tick_interval_s: float,
+) -> Tuple[asyncio.Task, asyncio.Event]:
+    """Schedule the controller as a task on the running event loop."""
+    stop_event = asyncio.Event()
+    task = asyncio.get_running_loop().create_task(_async_loop(
+        device_name, stores, paired_bms_host, paired_bms_port,
+        transducer_host, transducer_port,
+        tick_interval_s, stop_event,
+    ))
+    return task, stop_event
 
 
 def start_pcs_controller(
     *,
     device_name: str,
     stores: Dict[str, object],
-    lock: threading.RLock,
     paired_bms_host: str,
     paired_bms_port: int,
     transducer_host: str = "",
     transducer_port: int = 0,
     tick_interval_s: float,
 ) -> Tuple[threading.Thread, threading.Event]:
+    """Run the controller on its own thread and event loop."""
     stop_event = threading.Event()
     t = threading.Thread(
-        target=_loop,
-        args=(device_name, stores, lock, paired_bms_host, paired_bms_port,
-              transducer_host, transducer_port,
-              tick_interval_s, stop_event),
+        target=asyncio.run,
+        args=(_async_loop(device_name, stores, paired_bms_host, paired_bms_port,
+                          transducer_host, transducer_port,
+                          tick_interval_s, stop_event),),
         daemon=True,
     )
     t.start()
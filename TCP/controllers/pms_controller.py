@@ -6,7 +6,8 @@ Every tick:
    + HR 40424 (demand_direction: 0=discharge, 1=charge) → signed demand_kw.
 2. Read suppression percent from Suppression Logger HR0 (0-based).
 3. Split (suppressed) demand equally across PCS devices.
-4. Write each PCS HR 40043-40044 (fixed_active_p I32 gain=1000) via Modbus TCP.
+4. Write each PCS HR 40043-40044 (fixed_active_p I32 gain=1000) via Modbus TCP
+   — skipped while the setpoint is unchanged since the last successful write.
 5. Read each PCS IR 32080-32081 (active_power I32 gain=1000) via Modbus TCP.
 6. Read each BMS Huawei registers via Modbus TCP:
    - IR 30105-30106 (bcu1_soc + bcu1_soh, U16, gain=1)
@@ -14,29 +15,34 @@ Every tick:
 7. Write aggregates to own HR:
    - HR 40525-40526 (active_power I32 gain=1000)
    - HR 50000 (alarm: BMS1 bits[3:0] | BMS2 bits[11:8])
+
+Steps 4-6 are issued concurrently across devices on an asyncio loop
+(one persistent FastModbusClient connection per device).  start_pms_controller_async
+schedules the controller on the caller's running loop;
+start_pms_controller runs it on a dedicated thread.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import threading
 import time
-from typing import Dict, Tuple
-
-from pymodbus.client import ModbusTcpClient
-
-import sys, os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tcp_servers"))
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-from register_codec import encode_i32, decode_i32, encode_u32, decode_u32, decode_u16
+from tcp_servers.fast_modbus import FastModbusClient
+from tcp_servers.register_codec import encode_i32, decode_block
+from tcp_servers.tcp_utils import next_deadline as _next_deadline
 
 from specs.pms_registers import (
     ADDR_ACTIVE_ADJ,
     ADDR_DEMAND_DIRECTION,
     ADDR_ACTIVE_POWER,
     ADDR_ALARM_1,
+    DEMAND_BLOCK,
 )
+from specs.pcs_registers import ACTIVE_POWER_BLOCK
+from specs.bms_registers import TELE_ALARM_BLOCK
 
 log = logging.getLogger("pms_controller")
 
@@ -53,131 +59,239 @@ PMS_POWER_GAIN      = 1000   # active_power I32 gain
 PCS_HR_FIXED_ACTIVE_P = 40043   # I32, gain=1000, kW — write setpoint
 PCS_IR_ACTIVE_POWER   = 32080   # I32, gain=1000, kW — read output
 PCS_GAIN_POWER        = 1000
+PCS_SETPOINT_DEADBAND_KW = 0.05  # skip re-writing a setpoint closer than this
 
 # BMS Huawei addresses (read via Modbus TCP)
 BMS_IR_BCU1_SOC      = 30105   # U16, gain=1, %
 BMS_IR_BCU1_SOH      = 30106   # U16, gain=1, %
 BMS_IR_TELE_ALARM_1  = 39014   # U16, SOC-based alarm bits
 
+# HR 50000 bit offset of each BMS's alarm nibble
+BMS_ALARM_SHIFT = {"bms1": 0, "bms2": 8}
 
-def _tick(
-    stores: Dict[str, object],
-    lock: threading.RLock,
-    host: str,
-    pcs_ports: Dict[str, int],
-    bms_ports: Dict[str, int],
-    pairing: Dict[str, str],
-    suppression_host: str = "",
-    suppression_port: int = 0,
+
+async def read_device_block(
+    client: FastModbusClient, block: Dict[str, Any],
+) -> Optional[Dict[str, Any]]:
+    """Read a spec read-block (IR) in one transaction and decode its points.
+
+    block: {"start": addr, "count": n, "points": [point specs]} as defined
+    next to the register map in specs/*_registers.py.
+    Returns None on a Modbus exception response.
+    """
+    regs = await client.read_input_registers(block["start"], block["count"])
+    if regs is None:
+        return None
+    return decode_block(regs, block["start"], block["points"])
+
+
+async def _read_suppression_pct(supp_client: FastModbusClient) -> int:
+    """Read suppression_percent from Suppression Logger HR0 (100 on error)."""
+    try:
+        regs = await supp_client.read_holding_registers(0, 1)
+        if regs is not None:
+            return max(0, min(100, regs[0]))
+    except Exception:
+        supp_client.close()
+        log.warning("PMS: cannot read suppression logger — using 100%")
+    return 100
+
+
+async def _write_pcs_setpoint(
+    pcs_name: str, pcs_client: FastModbusClient, setpoint_regs: List[int],
+) -> bool:
+    """Write PCS HR 40043-40044 (I32 gain=1000). Returns True on success."""
+    try:
+        return await pcs_client.write_registers(PCS_HR_FIXED_ACTIVE_P, setpoint_regs)
+    except Exception:
+        pcs_client.close()
+        log.exception("PMS: error communicating with %s on port %d", pcs_name, pcs_client.port)
+    return False
+
+
+async def _read_pcs_active_power(
+    pcs_name: str, pcs_client: FastModbusClient,
+) -> Optional[float]:
+    """Read PCS IR 32080-32081 (active_power I32 gain=1000)."""
+    try:
+        values = await read_device_block(pcs_client, ACTIVE_POWER_BLOCK)
+        if values is not None:
+            return values["active_power"]
+    except Exception:
+        pcs_client.close()
+        log.exception("PMS: error communicating with %s on port %d", pcs_name, pcs_client.port)
+    return None
+
+
+async def _read_bms_alarm(
+    bms_name: str, bms_client: FastModbusClient,
+) -> Optional[int]:
+    """Read BMS IR 39014 (tele_alarm_1)."""
+    try:
+        values = await read_device_block(bms_client, TELE_ALARM_BLOCK)
+        if values is not None:
+            return values["tele_alarm_1"]
+    except Exception:
+        bms_client.close()
+        log.exception("PMS: error communicating with %s on port %d", bms_name, bms_client.port)
+    return None
+
+
+async def _tick(
+    hr_get: Callable[[int, int], Sequence[int]],
+    hr_set: Callable[[int, List[int]], None],
+    pcs_names: List[str],
+    pcs_clients: List[FastModbusClient],
+    bms_names: List[str],
+    bms_clients: List[FastModbusClient],
+    bms_shifts: List[int],
+    last_setpoint_kw: list,  # mutable container [Optional[float]]
+    supp_client: Optional[FastModbusClient] = None,
 ) -> None:
-    """One tick of the PMS controller."""
+    """One tick of the PMS controller.
+
+    Every device has its own connection, so requests to different devices
+    are issued concurrently (one outstanding request per connection):
+    all PCS writes, then all PCS reads, then all BMS reads.
+    Device names, clients and alarm bit offsets arrive as parallel lists
+    built once at startup, and hr_get / hr_set are the datastore methods
+    bound once, so a tick does no per-device dict lookups.
 
-    num_pcs = len(pcs_ports)
+    The setpoint is the same for every PCS, so it is encoded once and the
+    writes are skipped entirely while it stays within the deadband of the
+    last value every PCS accepted.
+    """
+
+    num_pcs = len(pcs_clients)
     if num_pcs == 0:
         return
 
     # 1) Read demand from own HR 40420-40421 (U32 gain=10, magnitude)
-    #    + HR 40424 (direction: 0=discharge, 1=charge)
-    with lock:
-        mag_regs = stores["hr"].getValues(PMS_HR_DEMAND_MAG, 2)
-        dir_regs = stores["hr"].getValues(PMS_HR_DEMAND_DIR, 1)
-    demand_mag_kw = decode_u32(list(mag_regs), gain=PMS_DEMAND_GAIN)
-    direction = dir_regs[0]  # 0=discharge (+kW), 1=charge (-kW)
+    #    + HR 40424 (direction: 0=discharge, 1=charge) — one block access
+    demand_regs = hr_get(DEMAND_BLOCK["start"], DEMAND_BLOCK["count"])
+    demand = decode_block(list(demand_regs), DEMAND_BLOCK["start"], DEMAND_BLOCK["points"])
+    demand_mag_kw = demand["active_adj"]
+    direction = demand["demand_direction"]  # 0=discharge (+kW), 1=charge (-kW)
     demand_kw = -demand_mag_kw if direction == 1 else demand_mag_kw
 
     # 1b) Read suppression_percent from Suppression Logger HR0
     supp_pct = 100
-    if suppression_host and suppression_port:
-        try:
-            supp_client = ModbusTcpClient(suppression_host, port=suppression_port)
-            supp_client.connect()
-            rr = supp_client.read_holding_registers(0, count=1, device_id=0)
-            if not rr.isError():
-                raw = rr.registers[0]
-                supp_pct = max(0, min(100, raw))
-            supp_client.close()
-        except Exception:
-            log.warning("PMS: cannot read suppression logger — using 100%")
+    if supp_client is not None:
+        supp_pct = await _read_suppression_pct(supp_client)
 
     # Apply suppression to discharge only (+kW)
     if demand_kw > 0 and supp_pct < 100:
         original_kw = demand_kw
         demand_kw = demand_kw * supp_pct / 100.0
-        log.info(f"Suppression {supp_pct}%: demand {original_kw:.1f} -> {demand_kw:.1f} kW")
+        log.info("Suppression %d%%: demand %.1f -> %.1f kW", supp_pct, original_kw, demand_kw)
 
     # 2) Split demand equally
     setpoint_kw = demand_kw / num_pcs
 
-    total_active_kw = 0.0
-    bms_alarms: Dict[str, int] = {}  # bms_name -> alarm bitfield
-
-    for pcs_name, pcs_port in pcs_ports.items():
-        # 3) Write PCS HR 40043-40044 (I32 gain=1000) via Modbus TCP
-        try:
-            pcs_client = ModbusTcpClient(host, port=pcs_port)
-            pcs_client.connect()
-            pcs_client.write_registers(
-                PCS_HR_FIXED_ACTIVE_P,
-                encode_i32(setpoint_kw, gain=PCS_GAIN_POWER),
-                device_id=0,
-            )
-
-            # 4) Read PCS IR 32080-32081 (active_power I32 gain=1000)
-            rr = pcs_client.read_input_registers(PCS_IR_ACTIVE_POWER, count=2, device_id=0)
-            if not rr.isError():
-                pcs_active_kw = decode_i32(list(rr.registers), gain=PCS_GAIN_POWER)
-                total_active_kw += pcs_active_kw
-            pcs_client.close()
-        except Exception:
-            log.exception(f"PMS: error communicating with {pcs_name} on port {pcs_port}")
-
-        # 5) Read paired BMS alarm (Huawei addresses)
-        bms_name = pairing.get(pcs_name)
-        if bms_name and bms_name in bms_ports:
-            bms_port = bms_ports[bms_name]
-            try:
-                bms_client = ModbusTcpClient(host, port=bms_port)
-                bms_client.connect()
-                # Read alarm (39014)
-                rr_alarm = bms_client.read_input_registers(BMS_IR_TELE_ALARM_1, count=1, device_id=0)
-                if not rr_alarm.isError():
-                    bms_alarms[bms_name] = rr_alarm.registers[0]
-                bms_client.close()
-            except Exception:
-                log.exception(f"PMS: error communicating with {bms_name} on port {bms_port}")
+    # 3) Write every PCS HR 40043-40044 concurrently (only when changed)
+    last_kw = last_setpoint_kw[0]
+    if last_kw is None or abs(setpoint_kw - last_kw) >= PCS_SETPOINT_DEADBAND_KW:
+        setpoint_regs = encode_i32(setpoint_kw, gain=PCS_GAIN_POWER)
+        written = await asyncio.gather(*(
+            _write_pcs_setpoint(name, client, setpoint_regs)
+            for name, client in zip(pcs_names, pcs_clients)
+        ))
+        # Cache only if every PCS took it, so a failed write is retried
+        last_setpoint_kw[0] = setpoint_kw if all(written) else None
+
+    # 4) Read every PCS IR 32080-32081 concurrently
+    pcs_results = await asyncio.gather(*(
+        _read_pcs_active_power(name, client)
+        for name, client in zip(pcs_names, pcs_clients)
+    ))
+    total_active_kw = sum(kw for kw in pcs_results if kw is not None)
+    if any(kw is None for kw in pcs_results):
+        # A PCS may have restarted and lost its setpoint — rewrite next tick
+        last_setpoint_kw[0] = None
+
+    # 5) Read every paired BMS alarm concurrently (Huawei addresses)
+    bms_results = await asyncio.gather(*(
+        _read_bms_alarm(name, client) for name, client in zip(bms_names, bms_clients)
+    ))
 
     # 6) Write aggregates into PMS HR (Huawei addresses)
-    with lock:
-        # HR 40525-40526: total active_power (I32 gain=1000)
-        stores["hr"].setValues(PMS_HR_ACTIVE_POWER, encode_i32(total_active_kw, gain=PMS_POWER_GAIN))
+    # HR 40525-40526: total active_power (I32 gain=1000)
+    hr_set(PMS_HR_ACTIVE_POWER, encode_i32(total_active_kw, gain=PMS_POWER_GAIN))
 
-        # HR 50000: BMS alarm forwarding
-        # bms1 bits [3:0] → alarm bits [3:0], bms2 bits [3:0] → alarm bits [11:8]
-        bms1_alarm = bms_alarms.get("bms1", 0) & 0x000F
-        bms2_alarm = bms_alarms.get("bms2", 0) & 0x000F
-        pms_alarm = bms1_alarm | (bms2_alarm << 8)
-        stores["hr"].setValues(PMS_HR_ALARM_1, [pms_alarm])
+    # HR 50000: BMS alarm forwarding
+    # bms1 bits [3:0] → alarm bits [3:0], bms2 bits [3:0] → alarm bits [11:8]
+    pms_alarm = 0
+    for alarm, shift in zip(bms_results, bms_shifts):
+        if alarm is not None:
+            pms_alarm |= (alarm & 0x000F) << shift
+    hr_set(PMS_HR_ALARM_1, [pms_alarm])
 
 
-def _loop(
-    stores, lock, host, pcs_ports, bms_ports, pairing,
+async def _async_loop(
+    stores, host, pcs_ports, bms_ports, pairing,
     tick_interval_s, stop_event,
     suppression_host, suppression_port,
 ):
     log.info("PMS controller loop started")
-    while not stop_event.is_set():
-        try:
-            _tick(stores, lock, host, pcs_ports, bms_ports, pairing,
-                  suppression_host, suppression_port)
-        except Exception:
-            log.exception("PMS controller tick error")
-        stop_event.wait(tick_interval_s)
+
+    # One persistent connection per peer device, reused for every tick.
+    # Flattened once into parallel lists; BMS lists follow PCS order.
+    pcs_names = list(pcs_ports)
+    pcs_clients = [FastModbusClient(host, pcs_ports[name]) for name in pcs_names]
+    bms_names = [
+        pairing[name] for name in pcs_names
+        if pairing.get(name) in bms_ports and pairing[name] in BMS_ALARM_SHIFT
+    ]
+    bms_clients = [FastModbusClient(host, bms_ports[name]) for name in bms_names]
+    bms_shifts = [BMS_ALARM_SHIFT[name] for name in bms_names]
+    supp_client = None
+    if suppression_host and suppression_port:
+        supp_client = FastModbusClient(suppression_host, suppression_port)
+    last_setpoint_kw = [None]  # last setpoint written to every PCS
+    hr_get = stores["hr"].getValues
+    hr_set = stores["hr"].setValues
+
+    next_deadline = time.monotonic() + tick_interval_s
+    try:
+        while not stop_event.is_set():
+            try:
+                await _tick(hr_get, hr_set, pcs_names, pcs_clients,
+                            bms_names, bms_clients, bms_shifts,
+                            last_setpoint_kw, supp_client)
+            except Exception:
+                log.exception("PMS controller tick error")
+            sleep_s, next_deadline = _next_deadline(next_deadline, tick_interval_s)
+            await asyncio.sleep(sleep_s)
+    finally:
+        for client in (*pcs_clients, *bms_clients, supp_client):
+            if client is not None:
+                client.close()
+
+
+def start_pms_controller_async(
+    *,
+    stores: Dict[str, object],
+    host: str,
+    pcs_ports: Dict[str, int],
+    bms_ports: Dict[str, int],
+    pairing: Dict[str, str],
+    tick_interval_s: float,
+    suppression_host: str = "",
+    suppression_port: int = 0,
+) -> Tuple[asyncio.Task, asyncio.Event]:
+    """Schedule the controller as a task on the running event loop."""
+    stop_event = asyncio.Event()
+    task = asyncio.get_running_loop().create_task(_async_loop(
+        stores, host, pcs_ports, bms_ports, pairing,
+        tick_interval_s, stop_event,
+        suppression_host, suppression_port,
+    ))
+    return task, stop_event
 
 
 def start_pms_controller(
     *,
     stores: Dict[str, object],
-    lock: threading.RLock,
     host: str,
     pcs_ports: Dict[str, int],
     bms_ports: Dict[str, int],
@@ -186,12 +300,13 @@ def start_pms_controller(
     suppression_host: str = "",
     suppression_port: int = 0,
 ) -> Tuple[threading.Thread, threading.Event]:
+    """Run the controller on its own thread and event loop."""
     stop_event = threading.Event()
     t = threading.Thread(
-        target=_loop,
-        args=(stores, lock, host, pcs_ports, bms_ports, pairing,
-              tick_interval_s, stop_event,
-              suppression_host, suppression_port),
+        target=asyncio.run,
+        args=(_async_loop(stores, host, pcs_ports, bms_ports, pairing,
+                          tick_interval_s, stop_event,
+                          suppression_host, suppression_port),),
         daemon=True,
     )
     t.start()
@@ -16,11 +16,8 @@ import threading
 import time
 from typing import Dict, Tuple
 
-import sys, os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tcp_servers"))
-
 from tcp_servers.tcp_context import encode_frequency_hz
+from tcp_servers.tcp_utils import next_deadline as _next_deadline
 
 log = logging.getLogger("transducer_controller")
 
@@ -35,35 +32,37 @@ DELTA_MAX = 0.05
 def _loop(
     device_name: str,
     stores: Dict[str, object],
-    lock: threading.RLock,
     tick_interval_s: float,
     stop_event: threading.Event,
 ) -> None:
-    log.info(f"{device_name} controller loop started (freq_init={FREQ_INIT} Hz, tick={tick_interval_s}s)")
+    log.info("%s controller loop started (freq_init=%s Hz, tick=%ss)",
+             device_name, FREQ_INIT, tick_interval_s)
 
     freq = FREQ_INIT
+    ir_set = stores["ir"].setValues  # bound once for the tick loop
+    uniform = random.uniform
+    next_deadline = time.monotonic() + tick_interval_s
 
     while not stop_event.is_set():
-        delta = random.uniform(-DELTA_MAX, DELTA_MAX)
+        delta = uniform(-DELTA_MAX, DELTA_MAX)
         freq = max(FREQ_MIN, min(FREQ_MAX, freq + delta))
 
-        with lock:
-            stores["ir"].setValues(TRANSDUCER_IR0_FREQUENCY, [encode_frequency_hz(freq)])
+        ir_set(TRANSDUCER_IR0_FREQUENCY, [encode_frequency_hz(freq)])
 
-        stop_event.wait(tick_interval_s)
+        sleep_s, next_deadline = _next_deadline(next_deadline, tick_interval_s)
+        stop_event.wait(sleep_s)
 
 
 def start_transducer_controller(
     *,
     device_name: str,
     stores: Dict[str, object],
-    lock: threading.RLock,
     tick_interval_s: float = 0.1,
 ) -> Tuple[threading.Thread, threading.Event]:
     stop_event = threading.Event()
     t = threading.Thread(
         target=_loop,
-        args=(device_name, stores, lock, tick_interval_s, stop_event),
+        args=(device_name, stores, tick_interval_s, stop_event),
         daemon=True,
     )
     t.start()
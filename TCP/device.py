@@ -2,6 +2,14 @@
 codec for Modbus TCP device model handling power and battery parameters.
 
 """
+import struct
+
+# Precompiled int16 -> uint16 packing: struct does the range check and
+# two's complement in C, with no Python branch.
+_I16 = struct.Struct(">h")  # signed int16
+_U16 = struct.Struct(">H")  # unsigned uint16
+
+
 class DeviceModel:
     HR0_ADDRESS = 0  # demand_control_power R/W
     HR1_ADDRESS = 1  # active_power R
@@ -14,18 +22,19 @@ class DeviceModel:
 
     @staticmethod
     def _u16_to_int16(x: int) -> int:
-        return x - 0x10000 if x >= 0x8000 else x
+        return (x ^ 0x8000) - 0x8000    # branchless sign extension
 
     @classmethod
     def encode_power_kw(cls, kw: float) -> int: 
         raw = int(round(kw / cls.POWER_SCALE))  # kW -> 0.1kW units
-        if raw < -32768 or raw > 32767:
-            raise ValueError("Power out of int16 range after scaling")
-        return cls._int16_to_u16(raw)
+        try:
+            return _U16.unpack(_I16.pack(raw))[0]
+        except struct.error:
+            raise ValueError("Power out of int16 range after scaling") from None
 
     @classmethod
     def decode_power_kw(cls, reg_u16: int) -> float: #input is uint16 from register, output is float in kW
-        raw = cls._u16_to_int16(reg_u16 & 0xFFFF) # just to be safe, mask to 16 bits before conversion
+        raw = ((reg_u16 & 0xFFFF) ^ 0x8000) - 0x8000 # just to be safe, mask to 16 bits before conversion
         return raw * cls.POWER_SCALE #convert back to kW
     
     # 
@@ -39,7 +48,7 @@ class DeviceModel:
     def encode_power_raw_units(cls, raw: int) -> int:
         if raw < -32768 or raw > 32767:
             raise ValueError("Power raw units out of int16 range")
-        return cls._int16_to_u16(raw)
+        return raw & 0xFFFF  # _int16_to_u16, inlined
 
     # --- Unsigned scaled uint16 helpers (SOC, SOH, capacity) ---
 
@@ -1,3 +1,5 @@
+from array import array
+
 HOST = "127.0.0.1"
 PORT = 15020
 
@@ -71,3 +73,18 @@ PCS_TO_BMS = {
     2: 4,   # PCS1 (uid=2) <-> BMS1 (uid=4)
     3: 5,   # PCS2 (uid=3) <-> BMS2 (uid=5)
 }
+
+
+def _init_array(registers, size):
+    """Register dict → fully materialised size-N uint16 array of init values."""
+    values = array("H", bytes(2 * size))
+    for addr, reg in registers.items():
+        # int16 -> uint16 two's complement (DeviceModel._int16_to_u16, inlined)
+        values[addr] = int(round(reg["init"] / reg["scale"])) & 0xFFFF
+    return values
+
+
+# Initial block contents, computed once at import; the server copies them
+for _spec in DEVICES.values():
+    _spec["hr_init_array"] = _init_array(_spec["hr_registers"], _spec["hr_size"])
+    _spec["ir_init_array"] = _init_array(_spec["ir_registers"], _spec["ir_size"])
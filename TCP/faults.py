@@ -1,4 +1,6 @@
 """
+Fault injection for the Modbus TCP server: response delay, drop,
+connection close, and response fragmentation.
 """
 
 import random
@@ -7,56 +9,52 @@ from typing import List
 
 
 class FaultInjector:
-    def __init__(self):
-        self.enabled = False
-        
-    def inject_delay(self, min_ms: int, max_ms: int) -> None:
-    
-        if not self.enabled:
-            return
-        # TODO: implement delay injection
-        pass
-        
-    def should_drop_response(self, drop_rate: float = 0.0) -> bool:
-        """Random response dropping"""
-        if not self.enabled:
-            return False
-        # TODO: implement response dropping
-        return False
-        
-    def chunk_response(self, response: bytes, min_chunk: int = 1, max_chunk: int = 1) -> List[bytes]:
-        """Fragment response into chunks"""
-        if not self.enabled:
-            return [response]
-        # TODO: implement response chunking
-        return [response]
+    def __init__(
+        self,
+        delay_ms_min: int = 0,
+        delay_ms_max: int = 0,
+        drop_rate: float = 0.0,
+        close_rate: float = 0.0,
+        chunk_min: int = 1,
+        chunk_max: int = 1,
+    ):
+        self.delay_ms_min = delay_ms_min
+        self.delay_ms_max = delay_ms_max
+        self.drop_rate = drop_rate
         self.close_rate = close_rate
+        self.chunk_min = chunk_min
+        self.chunk_max = chunk_max
+        # Own generator, its methods bound once for the per-response calls
+        self._rng = random.Random()
+        self._rand = self._rng.random
+        self._randint = self._rng.randint
 
     def maybe_sleep(self) -> None:
         if self.delay_ms_max <= 0:
             return
-        ms = random.randint(self.delay_ms_min, self.delay_ms_max)
+        if self.delay_ms_min >= self.delay_ms_max:
+            ms = self.delay_ms_max  # fixed delay: nothing to draw
+        else:
+            ms = self._randint(self.delay_ms_min, self.delay_ms_max)
         time.sleep(ms / 1000.0)
 
+    # A disabled fault (rate 0) short-circuits before drawing a random number
     def should_drop(self) -> bool:
-        return random.random() < self.drop_rate
+        return self.drop_rate > 0.0 and self._rand() < self.drop_rate
 
     def should_close(self) -> bool:
-        return random.random() < self.close_rate
+        return self.close_rate > 0.0 and self._rand() < self.close_rate
 
-    def chunk_bytes(self, data: bytes) -> List[bytes]:
+    def chunk_bytes(self, data: bytes) -> List[memoryview]:
+        """Split a response into chunks: zero-copy views into ``data``,
+        each writable to a socket/transport as-is."""
+        mv = memoryview(data)
         if self.chunk_max <= 1:
-            return [data]
-        n = random.randint(self.chunk_min, self.chunk_max)
-        if n <= 1 or len(data) <= 1:
-            return [data]
-
-        chunks = []
-        start = 0
-        for i in range(n - 1):
-            remaining = len(data) - start
-            cut = random.randint(1, max(1, remaining - (n - i - 1)))
-            chunks.append(data[start : start + cut])
-            start += cut
-        chunks.append(data[start:])
-        return [c for c in chunks if c]
+            return [mv]
+        n = min(self._randint(self.chunk_min, self.chunk_max), len(data))
+        if n <= 1:
+            return [mv]
+
+        # All n-1 distinct cut points in one call; sorted they give n non-empty chunks
+        cuts = sorted(self._rng.sample(range(1, len(data)), n - 1))
+        return [mv[i:j] for i, j in zip([0, *cuts], [*cuts, len(data)])]
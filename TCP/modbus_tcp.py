@@ -4,30 +4,36 @@ Modbus TCP server context and identity factory.
 Addressing — 0-based everywhere:
     pymodbus 3.x ModbusDeviceContext.getValues/setValues silently do
     ``address += 1`` before forwarding to the DataBlock.  We override that
-    in ZeroBasedDeviceContext so protocol address 0 → DataBlock index 0.
+    in ZeroBasedDeviceContext (tcp_servers/tcp_context.py) so protocol
+    address 0 → DataBlock index 0.
     Tick code, client code, and devices_spec all use 0-based addresses.
 
-Threading — shared RLock:
-    One threading.RLock guards every DataBlock read/write.
+Threading — one Lock per unit:
+    Each unit's HR and IR blocks share a plain threading.Lock, so a
+    Modbus read of one device never waits on a tick write to another.
     * LockedDataBlock.getValues/setValues acquire the lock per-call,
       so Modbus-server reads are safe against concurrent tick writes.
-    * tick_once() also wraps a full batch in ``with lock:`` for
-      cross-device consistency.  RLock is reentrant, so the inner
-      per-register calls don't deadlock.
+    * Neither method calls the other, so the lock need not be reentrant.
+    * Multi-register values are written with one setValues call, so a
+      reader never sees them half-updated.
+    * IR blocks are never written by clients, so they use
+      ActiveStandbyBlock: only writers take the lock, readers slice the
+      currently published list without locking.
 """
 
 import threading
+from array import array
 
 from pymodbus.datastore import (
-    ModbusDeviceContext,
     ModbusSequentialDataBlock,
     ModbusServerContext,
 )
 from pymodbus.datastore.store import ExcCodes
 from pymodbus import ModbusDeviceIdentification
 
-from device import DeviceModel
 from devices_spec import DEVICES
+# Shared with the multi-process servers; only the datablocks differ here
+from tcp_servers.tcp_context import RejectAllDataBlock, ZeroBasedDeviceContext
 
 
 # ---------------------------------------------------------------------------
@@ -38,87 +44,96 @@ class LockedDataBlock(ModbusSequentialDataBlock):
     """
     Thread-safe 0-based datablock.
 
-    Storage: values[i] corresponds to register address i.  No padding slot.
-    Every public access is guarded by a shared RLock.
+    Storage: values[i] corresponds to register address i, packed as an
+    ``array('H')`` (uint16).  No padding slot.
+    Every public access is guarded by the unit's Lock.
     """
 
-    def __init__(self, lock, size, init_values=None):
+    def __init__(self, lock, init_array):
         """
         Args:
-            lock:        threading.RLock shared across all blocks.
-            size:        number of registers (e.g. 10).
-            init_values: dict {0-based addr: uint16} for non-zero init.
+            lock:       threading.Lock shared by the unit's blocks.
+            init_array: array('H') of initial register values (copied),
+                        precomputed in devices_spec.
         """
-        values = [0] * size
-        if init_values:
-            for addr, u16 in init_values.items():
-                values[addr] = u16
-        super().__init__(0, values)
+        super().__init__(0, [0])  # dummy init for parent
+        self.values = array("H", init_array)
         self._lock = lock
 
     def getValues(self, address, count=1):
+        if address < 0 or len(self.values) < address + count:
+            return ExcCodes.ILLEGAL_ADDRESS
         with self._lock:
-            return super().getValues(address, count)
+            return self.values[address:address + count]
 
     def setValues(self, address, values):
+        if not isinstance(values, list):
+            values = [values]
+        if address < 0 or len(self.values) < address + len(values):
+            return ExcCodes.ILLEGAL_ADDRESS
         with self._lock:
-            return super().setValues(address, values)
+            self.values[address:address + len(values)] = array("H", values)
+        return None
 
 
-class RejectAllDataBlock(ModbusSequentialDataBlock):
-    """DataBlock that rejects every read/write with ILLEGAL_ADDRESS."""
+class ActiveStandbyBlock(ModbusSequentialDataBlock):
+    """
+    0-based datablock with lock-free reads (copy-on-write publish).
+
+    ``self.values`` is the active ``array('H')`` and is never mutated in
+    place.  setValues copies it into a standby array under the writer lock,
+    applies the update, then publishes the standby by rebinding
+    ``self.values`` — a single reference store under the GIL.  A reader
+    that loaded the previous array keeps a complete, consistent snapshot
+    until it drops its reference.
+    """
+
+    def __init__(self, lock, init_array):
+        """
+        Args:
+            lock:       threading.Lock serialising writers only.
+            init_array: array('H') of initial register values (copied),
+                        precomputed in devices_spec.
+        """
+        super().__init__(0, [0])  # dummy init for parent
+        self.values = array("H", init_array)
+        self._lock = lock
 
     def getValues(self, address, count=1):
-        return ExcCodes.ILLEGAL_ADDRESS
+        active = self.values  # one reference load; never mutated afterwards
+        if address < 0 or len(active) < address + count:
+            return ExcCodes.ILLEGAL_ADDRESS
+        return active[address:address + count]
 
     def setValues(self, address, values):
-        return ExcCodes.ILLEGAL_ADDRESS
-
-
-# ---------------------------------------------------------------------------
-# ZeroBasedDeviceContext — cancel pymodbus's implicit +1
-# ---------------------------------------------------------------------------
-
-class ZeroBasedDeviceContext(ModbusDeviceContext):
-    """
-    Override getValues/setValues to NOT add +1.
-
-    pymodbus 3.x parent does ``address += 1`` in both methods.
-    We skip that so protocol address 0 → DataBlock address 0.
-    async variants (async_getValues/async_setValues) delegate to
-    these sync methods via MRO, so they also get the fix.
-    """
+        if not isinstance(values, list):
+            values = [values]
+        if address < 0 or len(self.values) < address + len(values):
+            return ExcCodes.ILLEGAL_ADDRESS  # size is fixed, no lock needed
+        with self._lock:
+            standby = self.values[:]
+            standby[address:address + len(values)] = array("H", values)
+            self.values = standby  # publish
+        return None
 
-    def getValues(self, func_code, address, count=1):
-        return self.store[self.decode(func_code)].getValues(address, count)
 
-    def setValues(self, func_code, address, values):
-        return self.store[self.decode(func_code)].setValues(address, values)
+# Stateless, so one instance serves every unsupported slot of every device
+_REJECT_ALL = RejectAllDataBlock(0, [0])
 
 
 # ---------------------------------------------------------------------------
 # Factory helpers
 # ---------------------------------------------------------------------------
 
-def _build_init_values(registers):
-    """Convert devices_spec register dict → {0-based addr: uint16}."""
-    init = {}
-    for addr, reg in registers.items():
-        raw = int(round(reg["init"] / reg["scale"]))
-        init[addr] = DeviceModel._int16_to_u16(raw)
-    return init
-
-
 def create_server_context():
     """
-    Build Modbus server context with locked 0-based datablocks.
+    Build Modbus server context with 0-based datablocks: locked HR
+    blocks, lock-free-read IR blocks.
 
     Returns:
-        (server_context, stores, lock)
+        (server_context, stores)
         - stores: {unit_id: {"hr": block, "ir": block}}
-        - lock:   shared threading.RLock — pass to tick loop.
     """
-    lock = threading.RLock()
     slaves = {}
     stores = {}
 
@@ -126,30 +141,29 @@ def create_server_context():
         uid = spec["unit_id"]
         hr_size = spec["hr_size"]
         ir_size = spec["ir_size"]
+        lock = threading.Lock()  # per unit: devices never contend
 
         # HR block
         if hr_size > 0 and spec["hr_registers"]:
-            hr = LockedDataBlock(lock, hr_size,
-                                 _build_init_values(spec["hr_registers"]))
+            hr = LockedDataBlock(lock, spec["hr_init_array"])
         else:
-            hr = RejectAllDataBlock(0, [0])
+            hr = _REJECT_ALL
 
         # IR block
         if ir_size > 0 and spec["ir_registers"]:
-            ir = LockedDataBlock(lock, ir_size,
-                                 _build_init_values(spec["ir_registers"]))
+            ir = ActiveStandbyBlock(lock, spec["ir_init_array"])
         else:
-            ir = RejectAllDataBlock(0, [0])
+            ir = _REJECT_ALL
 
         ctx = ZeroBasedDeviceContext(
-            di=RejectAllDataBlock(0, [0]),
-            co=RejectAllDataBlock(0, [0]),
+            di=_REJECT_ALL,
+            co=_REJECT_ALL,
             hr=hr, ir=ir,
         )
         slaves[uid] = ctx
         stores[uid] = {"hr": hr, "ir": ir}
 
-    return ModbusServerContext(devices=slaves, single=False), stores, lock
+    return ModbusServerContext(devices=slaves, single=False), stores
 
 
 def create_device_identity():
@@ -4,32 +4,51 @@ and the Multimeter RTU server as separate processes.
 
 Usage:
     python plant.py --config config/plant.yaml
+    python plant.py --config config/plant.yaml --single-process
 
 Each device runs in its own process:
-  - PMS  (TCP server + PMS controller thread)
-  - PCS1 (TCP server + PCS controller thread)
-  - PCS2 (TCP server + PCS controller thread)
-  - BMS1 (TCP server + BMS controller thread)
-  - BMS2 (TCP server + BMS controller thread)
-  - Multimeter (RTU server + updater thread)
+  - PMS  (TCP server + PMS controller task)
+  - PCS1 (TCP server + PCS controller task)
+  - PCS2 (TCP server + PCS controller task)
+  - BMS1 (TCP server + BMS controller task)
+  - BMS2 (TCP server + BMS controller task)
+  - Multimeter (RTU server + updater task)
+
+With --single-process every device instead runs as coroutines on one
+event loop in this process.  Each device keeps its own ModbusServerContext
+and port, so the wire-level behaviour is identical.
 
 Controllers communicate with other devices ONLY via Modbus TCP/RTU.
-No shared memory across processes.
+No shared memory across devices.  In single-process mode, Modbus requests
+between devices on the loop are served in-process from the peer's context
+(see tcp_servers/fast_modbus.py); the register semantics are unchanged.
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
+import hashlib
+import itertools
+import json
 import logging
 import multiprocessing
 import os
 import signal
+import socket
 import sys
 import time
-from typing import Any, Dict, List
+from multiprocessing.connection import wait as mp_wait
+from typing import Any, Dict, Iterator, List, Optional
 
 import yaml
 
+try:  # optional C JSON parser
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s | PLANT | %(levelname)s | %(message)s",
@@ -37,74 +56,128 @@ logging.basicConfig(
 log = logging.getLogger("plant")
 
 
+# ---------------------------------------------------------------------------
+# CPU pinning: one core per device process, where the OS supports it
+# ---------------------------------------------------------------------------
+
+def _core_cycle() -> Iterator[Optional[int]]:
+    """Round-robin over the cores this process may run on (None if unsupported)."""
+    if not hasattr(os, "sched_getaffinity"):
+        return itertools.repeat(None)
+    return itertools.cycle(sorted(os.sched_getaffinity(0)))
+
+
+def _pin_to_core(core: Optional[int]) -> None:
+    """Pin the calling process to a single core; a no-op off Linux."""
+    if core is None or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(0, {core})
+    except OSError as e:
+        log.warning("Cannot pin pid %d to core %d: %s", os.getpid(), core, e)
+
+
 # ---------------------------------------------------------------------------
 # Process target wrappers (must be top-level for pickling on Windows)
 # ---------------------------------------------------------------------------
 
 def _start_pms(host, port, pcs_ports, bms_ports, pairing, tick_interval_s,
-               suppression_host="", suppression_port=0):
+               suppression_host="", suppression_port=0, core=None):
     """Entry for PMS subprocess."""
-    # Re-add paths in subprocess
-    base = os.path.dirname(os.path.abspath(__file__))
-    sys.path.insert(0, base)
-    sys.path.insert(0, os.path.join(base, "tcp_servers"))
-
+    _pin_to_core(core)
     from tcp_servers.pms_server import run_pms_server
     run_pms_server(host, port, pcs_ports, bms_ports, pairing, tick_interval_s,
                    suppression_host=suppression_host, suppression_port=suppression_port)
 
 
-def _start_pcs(device_name, host, port, paired_bms_host, paired_bms_port, tick_interval_s, transducer_host, transducer_port):
+def _start_pcs(device_name, host, port, paired_bms_host, paired_bms_port, tick_interval_s, transducer_host, transducer_port,
+               core=None):
     """Entry for PCS subprocess."""
-    base = os.path.dirname(os.path.abspath(__file__))
-    sys.path.insert(0, base)
-    sys.path.insert(0, os.path.join(base, "tcp_servers"))
-
+    _pin_to_core(core)
     from tcp_servers.pcs_server import run_pcs_server
     run_pcs_server(device_name, host, port, paired_bms_host, paired_bms_port, tick_interval_s,
                    transducer_host=transducer_host, transducer_port=transducer_port)
 
 
-def _start_bms(device_name, host, port, paired_pcs_host, paired_pcs_port, tick_interval_s):
+def _start_bms(device_name, host, port, paired_pcs_host, paired_pcs_port, tick_interval_s, core=None):
     """Entry for BMS subprocess."""
-    base = os.path.dirname(os.path.abspath(__file__))
-    sys.path.insert(0, base)
-    sys.path.insert(0, os.path.join(base, "tcp_servers"))
-
+    _pin_to_core(core)
     from tcp_servers.bms_server import run_bms_server
     run_bms_server(device_name, host, port, paired_pcs_host, paired_pcs_port, tick_interval_s)
 
 
-def _start_transducer(device_name, host, port, tick_interval_s):
+def _start_transducer(device_name, host, port, tick_interval_s, core=None):
     """Entry for Transducer subprocess."""
-    base = os.path.dirname(os.path.abspath(__file__))
-    sys.path.insert(0, base)
-    sys.path.insert(0, os.path.join(base, "tcp_servers"))
-
+    _pin_to_core(core)
     from tcp_servers.transducer_server import run_transducer_server
     run_transducer_server(device_name, host, port, tick_interval_s)
 
 
-def _start_suppression_logger(device_name, host, port):
+def _start_suppression_logger(device_name, host, port, core=None):
     """Entry for Suppression Logger subprocess."""
-    base = os.path.dirname(os.path.abspath(__file__))
-    sys.path.insert(0, base)
-    sys.path.insert(0, os.path.join(base, "tcp_servers"))
-
+    _pin_to_core(core)
     from tcp_servers.suppression_server import run_suppression_server
     run_suppression_server(device_name, host, port)
 
 
-def _start_multimeter(com_port, slave_id, baudrate, host, pcs_ports, loss_ratio, tick_interval_s):
-    """Entry for Multimeter RTU subprocess."""
-    base = os.path.dirname(os.path.abspath(__file__))
-    sys.path.insert(0, base)
-    sys.path.insert(0, os.path.join(base, "tcp_servers"))
+MULTIMETER_NICE = -5
 
+
+def _start_multimeter(com_port, slave_id, baudrate, host, pcs_ports, loss_ratio, tick_interval_s,
+                      core=None):
+    """Entry for Multimeter RTU subprocess."""
+    _pin_to_core(core)
+    # In its own process, raise priority to keep the updater cadence steady
+    # (a negative nice needs CAP_SYS_NICE)
+    if hasattr(os, "nice"):
+        try:
+            os.nice(MULTIMETER_NICE)
+        except OSError:
+            pass  # unprivileged: keep the default priority
     from rtu_multimeter.multimeter_rtu_server import run_multimeter_server
     run_multimeter_server(com_port, slave_id, baudrate, host, pcs_ports, loss_ratio, tick_interval_s)
 
 
+# ---------------------------------------------------------------------------
+# Readiness probes: a server is up once a TCP connect to its port succeeds
+# ---------------------------------------------------------------------------
+
+PORT_WAIT_TIMEOUT_S = 5.0
+PORT_POLL_INTERVAL_S = 0.02
+
+
+def _wait_ports(host: str, ports: List[int], timeout_s: float = PORT_WAIT_TIMEOUT_S) -> None:
+    """Block until every port accepts a connection, or the timeout passes."""
+    deadline = time.monotonic() + timeout_s
+    for port in ports:
+        while True:
+            try:
+                socket.create_connection((host, port), timeout=PORT_POLL_INTERVAL_S).close()
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    log.warning("Port %d not ready after %ss — continuing", port, timeout_s)
+                    return
+                time.sleep(PORT_POLL_INTERVAL_S)
+
+
+async def _wait_ports_async(host: str, ports: List[int],
+                            timeout_s: float = PORT_WAIT_TIMEOUT_S) -> None:
+    """_wait_ports for the single-process loop, without blocking it."""
+    deadline = time.monotonic() + timeout_s
+    for port in ports:
+        while True:
+            try:
+                _, writer = await asyncio.open_connection(host, port)
+                writer.close()
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    log.warning("Port %d not ready after %ss — continuing", port, timeout_s)
+                    return
+                await asyncio.sleep(PORT_POLL_INTERVAL_S)
+
+
 # ---------------------------------------------------------------------------
 # Plant class
 # ---------------------------------------------------------------------------
@@ -133,7 +206,8 @@ class Plant:
         return {k: v for k, v in self.tcp_ports.items() if k.startswith("bms")}
 
     def start(self) -> None:
-        """Launch all device processes."""
+        """Launch all device processes, each pinned to its own core."""
+        cores = _core_cycle()
 
         # 1) BMS servers first (PCS controllers need them)
         for bms_name, bms_port in self.bms_ports.items():
@@ -148,29 +222,32 @@ class Plant:
             p = multiprocessing.Process(
                 target=_start_bms,
                 args=(bms_name.upper(), self.host, bms_port,
-                      self.host, paired_pcs_port, self.tick),
+                      self.host, paired_pcs_port, self.tick, next(cores)),
                 name=f"proc-{bms_name}",
                 daemon=True,
             )
             p.start()
             self.processes.append(p)
-            log.info(f"Started {bms_name.upper()} process (pid={p.pid}, port={bms_port})")
+            log.info("Started %s process (pid=%d, port=%d)", bms_name.upper(), p.pid, bms_port)
 
         # 1b) Transducer (frequency sensor — always runs)
         transducer_port = self.tcp_ports.get("transducer")
         if transducer_port:
             p = multiprocessing.Process(
                 target=_start_transducer,
-                args=("TRANSDUCER", self.host, transducer_port, 0.1),
+                args=("TRANSDUCER", self.host, transducer_port, 0.1, next(cores)),
                 name="proc-transducer",
                 daemon=True,
             )
             p.start()
             self.processes.append(p)
-            log.info(f"Started TRANSDUCER process (pid={p.pid}, port={transducer_port})")
+            log.info("Started TRANSDUCER process (pid=%d, port=%d)", p.pid, transducer_port)
 
-        # Small delay so BMS servers bind before PCS tries to connect
-        time.sleep(1.0)
+        # Wait for BMS (and Transducer) to bind before PCS tries to connect
+        first_ports = list(self.bms_ports.values())
+        if transducer_port:
+            first_ports.append(transducer_port)
+        _wait_ports(self.host, first_ports)
 
         # 2) PCS servers
         for pcs_name, pcs_port in self.pcs_ports.items():
@@ -185,15 +262,15 @@ class Plant:
                 target=_start_pcs,
                 args=(pcs_name.upper(), self.host, pcs_port,
                       self.host, paired_bms_port, self.tick,
-                      t_host, t_port),
+                      t_host, t_port, next(cores)),
                 name=f"proc-{pcs_name}",
                 daemon=True,
             )
             p.start()
             self.processes.append(p)
-            log.info(f"Started {pcs_name.upper()} process (pid={p.pid}, port={pcs_port})")
+            log.info("Started %s process (pid=%d, port=%d)", pcs_name.upper(), p.pid, pcs_port)
 
-        time.sleep(1.0)
+        _wait_ports(self.host, list(self.pcs_ports.values()))
 
         # 2b) Suppression Logger (no controller, pure register store)
         supp_port = self.tcp_ports.get("suppression_logger")
@@ -201,14 +278,14 @@ class Plant:
         if supp_port:
             p = multiprocessing.Process(
                 target=_start_suppression_logger,
-                args=("SUPPRESSION", self.host, supp_port),
+                args=("SUPPRESSION", self.host, supp_port, next(cores)),
                 name="proc-suppression",
                 daemon=True,
             )
             p.start()
             self.processes.append(p)
             supp_host = self.host
-            log.info(f"Started SUPPRESSION process (pid={p.pid}, port={supp_port})")
+            log.info("Started SUPPRESSION process (pid=%d, port=%d)", p.pid, supp_port)
 
         # 3) PMS server
         pms_port = self.tcp_ports["pms"]
@@ -216,13 +293,14 @@ class Plant:
             target=_start_pms,
             args=(self.host, pms_port, self.pcs_ports, self.bms_ports,
                   self.pairing, self.tick),
-            kwargs={"suppression_host": supp_host, "suppression_port": supp_port or 0},
+            kwargs={"suppression_host": supp_host, "suppression_port": supp_port or 0,
+                    "core": next(cores)},
             name="proc-pms",
             daemon=True,
         )
         p.start()
         self.processes.append(p)
-        log.info(f"Started PMS process (pid={p.pid}, port={pms_port})")
+        log.info("Started PMS process (pid=%d, port=%d)", p.pid, pms_port)
 
         # 4) Multimeter RTU (optional — skipped by --no-multimeter flag or missing config)
         if self.no_multimeter:
@@ -238,28 +316,118 @@ class Plant:
                     self.pcs_ports,
                     self.loss,
                     self.tick,
+                    next(cores),
                 ),
                 name="proc-multimeter",
                 daemon=True,
             )
             p.start()
             self.processes.append(p)
-            log.info(f"Started Multimeter RTU process (pid={p.pid}, "
-                     f"port={self.com0com['server_port']})")
+            log.info("Started Multimeter RTU process (pid=%d, port=%s)",
+                     p.pid, self.com0com["server_port"])
         else:
             log.warning("com0com.server_port not configured in plant.yaml — skipping Multimeter RTU server")
 
         log.info("All device processes started.")
 
+    async def serve_all(self) -> None:
+        """Run every device on the current event loop (single-process mode).
+
+        Startup order and readiness waits mirror start(): BMS + Transducer first,
+        then PCS, then Suppression Logger + PMS.
+        """
+        from rtu_multimeter.multimeter_rtu_server import serve_multimeter_server
+        from tcp_servers.bms_server import serve_bms_server
+        from tcp_servers.pcs_server import serve_pcs_server
+        from tcp_servers.pms_server import serve_pms_server
+        from tcp_servers.suppression_server import serve_suppression_server
+        from tcp_servers.transducer_server import serve_transducer_server
+        from tcp_servers.tcp_utils import serve_in_process
+
+        # Inherited by every task spawned below: peers on this loop are
+        # served in-process instead of over localhost TCP
+        serve_in_process.set(True)
+        tasks: List[asyncio.Task] = []
+
+        def _spawn(coro, label: str) -> None:
+            tasks.append(asyncio.create_task(coro, name=label))
+            log.info("Started %s task", label)
+
+        # 1) BMS servers first (PCS controllers need them)
+        for bms_name, bms_port in self.bms_ports.items():
+            paired_pcs = next((pcs for pcs, bms in self.pairing.items() if bms == bms_name), None)
+            paired_pcs_port = self.tcp_ports.get(paired_pcs, 0) if paired_pcs else 0
+            _spawn(serve_bms_server(bms_name.upper(), self.host, bms_port,
+                                    self.host, paired_pcs_port, self.tick),
+                   bms_name.upper())
+
+        # 1b) Transducer
+        transducer_port = self.tcp_ports.get("transducer")
+        if transducer_port:
+            _spawn(serve_transducer_server("TRANSDUCER", self.host, transducer_port, 0.1),
+                   "TRANSDUCER")
+
+        first_ports = list(self.bms_ports.values())
+        if transducer_port:
+            first_ports.append(transducer_port)
+        await _wait_ports_async(self.host, first_ports)
+
+        # 2) PCS servers
+        for pcs_name, pcs_port in self.pcs_ports.items():
+            paired_bms_port = self.tcp_ports[self.pairing[pcs_name]]
+            _spawn(serve_pcs_server(pcs_name.upper(), self.host, pcs_port,
+                                    self.host, paired_bms_port, self.tick,
+                                    self.host if transducer_port else "",
+                                    transducer_port or 0),
+                   pcs_name.upper())
+
+        await _wait_ports_async(self.host, list(self.pcs_ports.values()))
+
+        # 2b) Suppression Logger
+        supp_port = self.tcp_ports.get("suppression_logger")
+        if supp_port:
+            _spawn(serve_suppression_server("SUPPRESSION", self.host, supp_port),
+                   "SUPPRESSION")
+
+        # 3) PMS server
+        _spawn(serve_pms_server(self.host, self.tcp_ports["pms"], self.pcs_ports,
+                                self.bms_ports, self.pairing, self.tick,
+                                suppression_host=self.host if supp_port else "",
+                                suppression_port=supp_port or 0),
+               "PMS")
+
+        # 4) Multimeter RTU (serial server + updater task)
+        if self.no_multimeter:
+            log.info("--no-multimeter flag set — skipping Multimeter RTU server")
+        elif self.com0com and self.com0com.get("server_port"):
+            _spawn(serve_multimeter_server(
+                       self.com0com["server_port"],
+                       self.com0com.get("slave_id", 10),
+                       self.com0com.get("baudrate", 9600),
+                       self.host,
+                       self.pcs_ports,
+                       self.loss,
+                       self.tick,
+                   ),
+                   "MULTIMETER")
+        else:
+            log.warning("com0com.server_port not configured in plant.yaml — skipping Multimeter RTU server")
+
+        log.info("All device tasks started.")
+        await asyncio.gather(*tasks)
+
     def wait(self) -> None:
         """Block until all processes exit or Ctrl-C."""
+        # Block in the kernel on the process sentinels; no periodic wake-ups.
+        # Windows only delivers Ctrl-C between waits, so it keeps a timeout.
+        timeout = 1.0 if sys.platform == "win32" else None
+        pending = {p.sentinel: p for p in self.processes}
         try:
-            while True:
-                alive = [p for p in self.processes if p.is_alive()]
-                if not alive:
-                    log.info("All processes exited.")
-                    break
-                time.sleep(1.0)
+            while pending:
+                for sentinel in mp_wait(list(pending), timeout=timeout):
+                    p = pending.pop(sentinel)
+                    log.info("%s exited (pid=%d, exitcode=%s)", p.name, p.pid, p.exitcode)
+            log.info("All processes exited.")
         except KeyboardInterrupt:
             log.info("Ctrl-C received — shutting down.")
             self.stop()
@@ -268,7 +436,7 @@ class Plant:
         """Terminate all child processes."""
         for p in self.processes:
             if p.is_alive():
-                log.info(f"Terminating {p.name} (pid={p.pid})")
+                log.info("Terminating %s (pid=%d)", p.name, p.pid)
                 p.terminate()
         for p in self.processes:
             p.join(timeout=5)
@@ -279,9 +447,57 @@ class Plant:
 # CLI
 # ---------------------------------------------------------------------------
 
+def _config_cache_dir() -> str:
+    """Per-user cache directory for parsed configs ($XDG_CACHE_HOME or ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "modbus_plant")
+
+
 def load_config(path: str) -> Dict[str, Any]:
-    with open(path, "r") as f:
-        return yaml.safe_load(f)
+    """Load the plant config from YAML or JSON.
+
+    A parsed YAML config is cached as JSON in the user cache directory,
+    keyed by a SHA-256 of the YAML bytes, so any edit to the file misses
+    the cache regardless of timestamps.  Only a config that JSON
+    round-trips unchanged is cached (integer mapping keys and dates do
+    not).  Cache failures (no writable cache directory, corrupt entry)
+    fall back to parsing the YAML.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    if path.endswith(".json"):
+        return _json_loads(raw)
+
+    cache_dir = _config_cache_dir()
+    cache_path = os.path.join(cache_dir, hashlib.sha256(raw).hexdigest() + ".json")
+    try:
+        with open(cache_path, "rb") as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        pass  # no cache entry yet, or unreadable: parse the YAML
+
+    config = yaml.safe_load(raw)
+    try:
+        encoded = json.dumps(config)
+        cacheable = json.loads(encoded) == config
+    except (TypeError, ValueError):
+        cacheable = False  # e.g. a YAML date: not JSON-serialisable
+    if not cacheable:
+        return config  # parse the YAML every start
+
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            f.write(encoded)
+        os.replace(tmp_path, cache_path)  # readers never see a partial entry
+    except OSError:
+        # unwritable cache directory: parse the YAML every start
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return config
 
 
 def main() -> None:
@@ -290,16 +506,31 @@ def main() -> None:
                         help="Path to plant.yaml config file")
     parser.add_argument("--no-multimeter", action="store_true",
                         help="Skip Multimeter RTU server (useful when com0com is not installed)")
+    parser.add_argument("--single-process", action="store_true",
+                        help="Run all devices on one event loop in this process")
     args = parser.parse_args()
 
     config_path = args.config
     if not os.path.isabs(config_path):
         config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), config_path)
 
-    log.info(f"Loading config from {config_path}")
+    log.info("Loading config from %s", config_path)
     config = load_config(config_path)
 
     plant = Plant(config, no_multimeter=args.no_multimeter)
+    if args.single_process:
+        from tcp_servers.tcp_utils import run_event_loop
+        try:
+            run_event_loop(plant.serve_all())
+        except KeyboardInterrupt:
+            log.info("Ctrl-C received — shutting down.")
+        return
+
+    if sys.platform.startswith("linux"):
+        # Children inherit the parent's already-imported modules (CoW)
+        # instead of re-importing pymodbus etc.; the plant parent starts no
+        # threads before forking, so fork is safe here.
+        multiprocessing.set_start_method("fork", force=True)
     plant.start()
     plant.wait()
 
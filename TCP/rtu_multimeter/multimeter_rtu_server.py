@@ -1,14 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-import sys
 import os
-import threading
 import time
-from typing import Dict
+from typing import Dict, Optional
 
-from pymodbus.server import StartSerialServer
-from pymodbus.client import ModbusTcpClient
+from pymodbus.server import ModbusSerialServer
 from pymodbus.datastore import (
     ModbusSequentialDataBlock,
     ModbusServerContext,
@@ -16,22 +14,23 @@ from pymodbus.datastore import (
 from serial.tools import list_ports as _serial_list_ports
 from serial import SerialException
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tcp_servers"))
-
 from tcp_servers.tcp_context import (
-    LockedDataBlock,
+    ArrayDataBlock,
     RejectAllDataBlock,
     ZeroBasedDeviceContext,
     encode_power_kw,
 )
-from register_codec import decode_i32
+from tcp_servers.fast_modbus import FastModbusClient
+from tcp_servers.register_codec import decode_i32
+from tcp_servers.tcp_utils import run_event_loop
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s | MULTIMETER | %(levelname)s | %(message)s",
 )
 log = logging.getLogger("multimeter")
+# The updater logs a status line every tick; MM_LOG_LEVEL=WARNING silences it
+log.setLevel(os.getenv("MM_LOG_LEVEL", "INFO").upper())
 
 IR0_ACTIVE_POWER = 0
 PCS_IR_ACTIVE_POWER = 32080   # Huawei PCS2000HA: I32, gain=1000
@@ -41,13 +40,20 @@ SERIAL_PORT = os.getenv("MM_RTU_PORT", "COM6")
 DEVICE_ID = int(os.getenv("MM_RTU_DEVICE_ID", "10"))
 
 
-def _updater_loop(
-    stores: Dict[str, LockedDataBlock],
-    lock: threading.RLock,
+async def _read_pcs_kw(client: FastModbusClient) -> Optional[float]:
+    """Read one PCS active power (kW), or None on a Modbus exception response."""
+    regs = await client.read_input_registers(PCS_IR_ACTIVE_POWER, 2)
+    if regs is None:
+        return None
+    return decode_i32(regs, gain=PCS_GAIN_POWER)
+
+
+async def _updater_loop_async(
+    stores: Dict[str, ArrayDataBlock],
     host: str,
     pcs_ports: Dict[str, int],
     loss_ratio: float,
-    stop_event: threading.Event,
+    stop_event,  # threading.Event or asyncio.Event
     interval_s: float = 1.0,
     slave_id: int = 10,
     com_port: str = "COM6",
@@ -58,68 +64,72 @@ def _updater_loop(
     comm_status: Dict[str, str] = {name: "unknown" for name in pcs_ports}
     error_counts: Dict[str, int] = {name: 0 for name in pcs_ports}
 
-    while not stop_event.is_set():
-        total_pcs_kw = 0.0
-        degraded = False
+    # One persistent connection per PCS; reconnect only after an error
+    clients = {name: FastModbusClient(host, port) for name, port in pcs_ports.items()}
 
-        for pcs_name, pcs_port in pcs_ports.items():
-            try:
-                client = ModbusTcpClient(host, port=pcs_port)
-                client.connect()
-                rr = client.read_input_registers(
-                    PCS_IR_ACTIVE_POWER, count=2, device_id=0,
-                )
-                if not rr.isError():
-                    pcs_kw = decode_i32(list(rr.registers), gain=PCS_GAIN_POWER)
-                    last_good[pcs_name] = pcs_kw
+    try:
+        while not stop_event.is_set():
+            total_pcs_kw = 0.0
+            degraded = False
+
+            # All PCS polls in flight at once: poll latency is max(RTT), not sum
+            results = await asyncio.gather(
+                *(_read_pcs_kw(c) for c in clients.values()),
+                return_exceptions=True,
+            )
+
+            for (pcs_name, client), result in zip(clients.items(), results):
+                if result is not None and not isinstance(result, BaseException):
+                    last_good[pcs_name] = result
                     comm_status[pcs_name] = "ok"
                     error_counts[pcs_name] = 0
-                    total_pcs_kw += pcs_kw
-                else:
-                    total_pcs_kw += last_good[pcs_name]
-                    comm_status[pcs_name] = "degraded"
-                    error_counts[pcs_name] += 1
-                    degraded = True
-                    log.warning(
-                        f"{pcs_name}: read error ({rr}) — using last good "
-                        f"{last_good[pcs_name]:+.1f} kW "
-                        f"(consecutive_errors={error_counts[pcs_name]})"
-                    )
-                client.close()
-            except Exception:
+                    total_pcs_kw += result
+                    continue
+
                 total_pcs_kw += last_good[pcs_name]
                 comm_status[pcs_name] = "degraded"
                 error_counts[pcs_name] += 1
                 degraded = True
-                log.warning(
-                    f"{pcs_name}: TCP poll failed port {pcs_port} — "
-                    f"using last good {last_good[pcs_name]:+.1f} kW "
-                    f"(consecutive_errors={error_counts[pcs_name]})",
-                    exc_info=(error_counts[pcs_name] <= 3),
-                )
+                if result is None:
+                    log.warning(
+                        "%s: read error (exception response) — using last good "
+                        "%+.1f kW (consecutive_errors=%d)",
+                        pcs_name, last_good[pcs_name], error_counts[pcs_name],
+                    )
+                else:
+                    client.close()  # next poll reconnects
+                    log.warning(
+                        "%s: TCP poll failed port %d — "
+                        "using last good %+.1f kW (consecutive_errors=%d)",
+                        pcs_name, client.port, last_good[pcs_name], error_counts[pcs_name],
+                        exc_info=result if error_counts[pcs_name] <= 3 else None,
+                    )
 
-        mm_power_kw = (1.0 - loss_ratio) * total_pcs_kw
-        ir0_encoded = encode_power_kw(mm_power_kw)
+            mm_power_kw = (1.0 - loss_ratio) * total_pcs_kw
+            ir0_encoded = encode_power_kw(mm_power_kw)
 
-        with lock:
             stores["ir"].setValues(IR0_ACTIVE_POWER, [ir0_encoded])
 
-        pcs_detail = ", ".join(
-            f"{n}={last_good[n]:+.1f}kW[{comm_status[n]}]"
-            for n in pcs_ports
-        )
-        tag = "DEGRADED" if degraded else "OK"
-        log.info(
-            f"[{tag}] {pcs_detail} | "
-            f"sum={total_pcs_kw:+.1f}kW loss={loss_ratio} "
-            f"ir0=0x{ir0_encoded:04X}({mm_power_kw:+.1f}kW) | "
-            f"dev={slave_id} port={com_port}"
-        )
+            # Per-tick status line: skip building the PCS detail string
+            # entirely when INFO is filtered out (MM_LOG_LEVEL=WARNING)
+            if log.isEnabledFor(logging.INFO):
+                pcs_detail = ", ".join(
+                    f"{n}={last_good[n]:+.1f}kW[{comm_status[n]}]"
+                    for n in pcs_ports
+                )
+                log.info(
+                    "[%s] %s | sum=%+.1fkW loss=%s ir0=0x%04X(%+.1fkW) | dev=%s port=%s",
+                    "DEGRADED" if degraded else "OK", pcs_detail,
+                    total_pcs_kw, loss_ratio, ir0_encoded, mm_power_kw, slave_id, com_port,
+                )
 
-        stop_event.wait(interval_s)
+            await asyncio.sleep(interval_s)
+    finally:
+        for client in clients.values():
+            client.close()
 
 
-def run_multimeter_server(
+async def serve_multimeter_server(
     com_port: str,
     slave_id: int,
     baudrate: int,
@@ -133,14 +143,13 @@ def run_multimeter_server(
     available = [p.device.upper().strip() for p in _serial_list_ports.comports()]
     if com_port not in available:
         log.warning(
-            f"COM port {com_port} not found in system "
-            f"(available: {available if available else 'none'}) "
-            f"— skipping Multimeter RTU server"
+            "COM port %s not found in system (available: %s) "
+            "— skipping Multimeter RTU server",
+            com_port, available if available else "none",
         )
         return
 
-    lock = threading.RLock()
-    ir_block = LockedDataBlock(lock, 10, {0: 0})
+    ir_block = ArrayDataBlock(10, {0: 0})
 
     device_ctx = ZeroBasedDeviceContext(
         di=RejectAllDataBlock(0, [0]),
@@ -153,18 +162,16 @@ def run_multimeter_server(
     )
     stores = {"ir": ir_block}
 
-    stop_event = threading.Event()
-    updater = threading.Thread(
-        target=_updater_loop,
-        args=(stores, lock, host, pcs_ports, loss_ratio, stop_event,
-              tick_interval_s, slave_id, com_port),
-        daemon=True,
+    # The updater polls the PCS as a task on the same loop as the serial server
+    stop_event = asyncio.Event()
+    updater = asyncio.get_running_loop().create_task(
+        _updater_loop_async(stores, host, pcs_ports, loss_ratio, stop_event,
+                            tick_interval_s, slave_id, com_port),
     )
-    updater.start()
 
-    log.info(f"Multimeter RTU server on {com_port} (slave_id={slave_id}, baud={baudrate})")
+    log.info("Multimeter RTU server on %s (slave_id=%s, baud=%s)", com_port, slave_id, baudrate)
     try:
-        StartSerialServer(
+        await ModbusSerialServer(
             server_ctx,
             port=com_port,
             baudrate=baudrate,
@@ -172,23 +179,46 @@ def run_multimeter_server(
             parity="N",
             stopbits=1,
             timeout=1,
-        )
+        ).serve_forever()
     except FileNotFoundError as exc:
-        log.warning(f"COM port {com_port} not found when opening: {exc} — Multimeter not started")
+        log.warning("COM port %s not found when opening: %s — Multimeter not started", com_port, exc)
         stop_event.set()
     except SerialException as exc:
         msg = str(exc).lower()
         if "access is denied" in msg or "permissionerror" in msg or "permission" in msg:
             log.error(
-                f"COM port {com_port} is busy or access denied: {exc} "
-                f"— close the other application and restart"
+                "COM port %s is busy or access denied: %s "
+                "— close the other application and restart",
+                com_port, exc,
             )
         else:
-            log.exception(f"Serial error on {com_port}")
+            log.exception("Serial error on %s", com_port)
         stop_event.set()
     except Exception:
-        log.exception(f"Unexpected error starting RTU server on {com_port}")
+        log.exception("Unexpected error starting RTU server on %s", com_port)
         stop_event.set()
+    await updater
+
+
+def run_multimeter_server(
+    com_port: str,
+    slave_id: int,
+    baudrate: int,
+    host: str,
+    pcs_ports: Dict[str, int],
+    loss_ratio: float,
+    tick_interval_s: float = 1.0,
+) -> None:
+    """Blocking entry point: serve_multimeter_server on its own event loop."""
+    run_event_loop(serve_multimeter_server(
+        com_port=com_port,
+        slave_id=slave_id,
+        baudrate=baudrate,
+        host=host,
+        pcs_ports=pcs_ports,
+        loss_ratio=loss_ratio,
+        tick_interval_s=tick_interval_s,
+    ))
 
 
 if __name__ == "__main__":
@@ -1,25 +1,25 @@
 import logging
-from pymodbus.server import StartTcpServer
 from modbus_tcp import create_server_context, create_device_identity
 from devices_spec import HOST, PORT, DEVICES
-from tick import start_tick_loop
+from tick import build_tick_plan, start_tick_loop
+from tcp_servers.tcp_utils import run_tcp_server
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 
 
 def run_server():
-    context, stores, lock = create_server_context()
+    context, stores = create_server_context()
     identity = create_device_identity()
 
     device_list = ", ".join(f"{name}(uid={spec['unit_id']})" for name, spec in DEVICES.items())
-    logging.info(f"Starting Modbus TCP Server on {HOST}:{PORT}")
-    logging.info(f"Devices: {device_list}")
+    logging.info("Starting Modbus TCP Server on %s:%s", HOST, PORT)
+    logging.info("Devices: %s", device_list)
 
     # Start simulation tick loop in background (daemon thread)
-    tick_thread, tick_stop = start_tick_loop(stores, lock=lock, interval=1.0)
+    tick_thread, tick_stop = start_tick_loop(build_tick_plan(stores), interval=1.0)
     logging.info("Tick loop started (interval=1.0s)")
 
-    StartTcpServer(context, identity=identity, address=(HOST, PORT))
+    run_tcp_server(context, (HOST, PORT), identity=identity)
 
 
 if __name__ == "__main__":
@@ -18,12 +18,9 @@ Simulator note:
 
 from __future__ import annotations
 
-import sys
-import os
 from typing import Any, Dict, List, Tuple
 
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tcp_servers"))
-from register_codec import encode_block
+from tcp_servers.register_codec import encode_block
 
 # =========================================================================
 # Block 1: Container status (30000-30002) — STATIC (IR)
@@ -147,6 +144,17 @@ ADDR_BCU1_CHG_DIS_P = 30107   # I32, gain=1000, unit=kW
 ADDR_CONTAINER_ALARM = 30118  # U16, temperature/humidity alarms
 ADDR_TELE_ALARM_1    = 39014  # U16, simulator SOC alarms (bits 0-3)
 
+# =========================================================================
+# Read blocks — contiguous ranges a peer fetches in one transaction
+# =========================================================================
+
+# PMS: SOC alarm bits (39014)
+TELE_ALARM_BLOCK = {
+    "start": ADDR_TELE_ALARM_1,
+    "count": 1,
+    "points": [pt for pt in SUBSYSTEM_ALARM_POINTS if pt["name"] == "tele_alarm_1"],
+}
+
 # =========================================================================
 # Default static values
 # =========================================================================
@@ -20,12 +20,9 @@ Legacy compatibility:
 
 from __future__ import annotations
 
-import sys
-import os
 from typing import Any, Dict, List, Tuple
 
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tcp_servers"))
-from register_codec import encode_block
+from tcp_servers.register_codec import encode_block
 
 # =========================================================================
 # Block 1: Identity (30000-30070, 71 regs) — STATIC (IR)
@@ -154,6 +151,17 @@ ADDR_BATT_SOC       = 32463   # U16, gain=10, unit=%
 ADDR_BATT_SOH       = 32464   # U16, gain=10, unit=%
 ADDR_FIXED_ACTIVE_P = 40043   # I32, gain=1000, unit=kW — setpoint from PMS
 
+# =========================================================================
+# Read blocks — contiguous ranges a peer fetches in one transaction
+# =========================================================================
+
+# PMS: measured active power (32080-32081)
+ACTIVE_POWER_BLOCK = {
+    "start": ADDR_ACTIVE_POWER,
+    "count": 2,
+    "points": [pt for pt in POWER_POINTS if pt["name"] == "active_power"],
+}
+
 # =========================================================================
 # Default static values (used when no plant.yaml override)
 # =========================================================================
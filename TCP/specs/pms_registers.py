@@ -20,12 +20,9 @@ Simulator note:
 
 from __future__ import annotations
 
-import sys
-import os
 from typing import Any, Dict
 
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tcp_servers"))
-from register_codec import encode_block
+from tcp_servers.register_codec import encode_block
 
 # =========================================================================
 # Block 1: Control (40420-40429, 10 regs) — RW (HR)
@@ -111,6 +108,17 @@ ADDR_ACTIVE_POWER      = 40525  # I32, gain=1000, kW — total active power aggr
 ADDR_ALARM_1           = 50000  # U16, BMS alarm forwarding (bits 0-3 = BMS1, bits 8-11 = BMS2)
 ADDR_ALARM_2           = 50001  # U16, reserved
 
+# =========================================================================
+# Read blocks — contiguous ranges fetched in one access
+# =========================================================================
+
+# Controller: demand magnitude + direction (40420-40424)
+DEMAND_BLOCK = {
+    "start": ADDR_ACTIVE_ADJ,
+    "count": ADDR_DEMAND_DIRECTION - ADDR_ACTIVE_ADJ + 1,
+    "points": [pt for pt in CONTROL_POINTS if pt["name"] in ("active_adj", "demand_direction")],
+}
+
 # =========================================================================
 # Default static values
 # =========================================================================
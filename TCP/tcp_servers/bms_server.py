@@ -8,21 +8,15 @@ Address layout (Huawei LUNA2000C ESS):
   IR  39014-39017  Subsystem telealarm (SOC-based alarms in simulator)
 
 No Holding Registers — BMS is read-only.
-Runs the BMS controller loop in a background thread within this process.
+Runs the BMS controller as a task on the server's event loop.
 """
 
 from __future__ import annotations
 
 import logging
-import sys
-import os
 
-from pymodbus.server import StartTcpServer
-
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-from tcp_context import build_multirange_server_context
+from tcp_servers.tcp_context import build_multirange_server_context
+from tcp_servers.tcp_utils import run_event_loop, serve_tcp
 from specs.bms_registers import (
     CONTAINER_RANGE_START,
     CONTAINER_RANGE_SIZE,
@@ -42,7 +36,7 @@ logging.basicConfig(
 log = logging.getLogger("bms_server")
 
 
-def run_bms_server(
+async def serve_bms_server(
     device_name: str,
     host: str,
     port: int,
@@ -53,7 +47,7 @@ def run_bms_server(
     init_soh: float = 100.0,
     init_capacity_kwh: float = 100.0,
 ) -> None:
-    """Start a BMS TCP server and its controller thread."""
+    """Start a BMS TCP server and its controller task."""
 
     # Build init values for all IR ranges
     all_init = build_static_init(overrides={
@@ -67,7 +61,7 @@ def run_bms_server(
     def _pick(start, size):
         return {k: v for k, v in all_init.items() if start <= k < start + size}
 
-    server_ctx, stores, lock = build_multirange_server_context(
+    server_ctx, stores = build_multirange_server_context(
         ir_ranges=[
             (CONTAINER_RANGE_START, CONTAINER_RANGE_SIZE, _pick(CONTAINER_RANGE_START, CONTAINER_RANGE_SIZE)),
             (BCU1_RANGE_START, BCU1_RANGE_SIZE, _pick(BCU1_RANGE_START, BCU1_RANGE_SIZE)),
@@ -77,23 +71,51 @@ def run_bms_server(
         slave_id=0,
     )
 
-    from controllers.bms_controller import start_bms_controller
-    ctrl_thread, ctrl_stop = start_bms_controller(
+    from controllers.bms_controller import start_bms_controller_async
+    ctrl_task, ctrl_stop = start_bms_controller_async(
         device_name=device_name,
         stores=stores,
-        lock=lock,
         paired_pcs_host=paired_pcs_host,
         paired_pcs_port=paired_pcs_port,
         tick_interval_s=tick_interval_s,
         init_soc=init_soc,
         capacity_kwh=init_capacity_kwh,
     )
-    log.info(f"{device_name} controller thread started (tick={tick_interval_s}s)")
-    log.info(f"{device_name} Huawei registers: IR {CONTAINER_RANGE_START}-{CONTAINER_RANGE_START + CONTAINER_RANGE_SIZE - 1} (container), "
-             f"IR {BCU1_RANGE_START}-{BCU1_RANGE_START + BCU1_RANGE_SIZE - 1} (BCU-1), "
-             f"IR {SUBSYSTEM_ALARM_RANGE_START}-{SUBSYSTEM_ALARM_RANGE_START + SUBSYSTEM_ALARM_RANGE_SIZE - 1} (alarm)")
-    log.info(f"{device_name} unit_id=0, TCP server listening on {host}:{port}")
-    StartTcpServer(server_ctx, address=(host, port))
+    log.info("%s controller task started (tick=%ss)", device_name, tick_interval_s)
+    log.info(
+        "%s Huawei registers: IR %d-%d (container), IR %d-%d (BCU-1), IR %d-%d (alarm)",
+        device_name,
+        CONTAINER_RANGE_START, CONTAINER_RANGE_START + CONTAINER_RANGE_SIZE - 1,
+        BCU1_RANGE_START, BCU1_RANGE_START + BCU1_RANGE_SIZE - 1,
+        SUBSYSTEM_ALARM_RANGE_START, SUBSYSTEM_ALARM_RANGE_START + SUBSYSTEM_ALARM_RANGE_SIZE - 1,
+    )
+    log.info("%s unit_id=0, TCP server listening on %s:%s", device_name, host, port)
+    await serve_tcp(server_ctx, (host, port))
+
+
+def run_bms_server(
+    device_name: str,
+    host: str,
+    port: int,
+    paired_pcs_host: str,
+    paired_pcs_port: int,
+    tick_interval_s: float,
+    init_soc: float = 50.0,
+    init_soh: float = 100.0,
+    init_capacity_kwh: float = 100.0,
+) -> None:
+    """Blocking entry point: serve_bms_server on its own event loop."""
+    run_event_loop(serve_bms_server(
+        device_name=device_name,
+        host=host,
+        port=port,
+        paired_pcs_host=paired_pcs_host,
+        paired_pcs_port=paired_pcs_port,
+        tick_interval_s=tick_interval_s,
+        init_soc=init_soc,
+        init_soh=init_soh,
+        init_capacity_kwh=init_capacity_kwh,
+    ))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,233 @@
+"""
+Minimal Modbus TCP framing for the hot paths: controller peer I/O and
+server-side register reads.
+
+Provides:
+- FastModbusClient:       asyncio client that frames FC03/FC04/FC16 requests
+                          with precompiled structs and parses responses directly.
+- FastReadRequestHandler: pymodbus server connection handler that answers
+                          plain FC03/FC04 reads with one pre-framed write.
+- FastReadTcpServer:      ModbusTcpServer using FastReadRequestHandler.
+- register_local_server:  Make a served context reachable in-process, so
+                          FastModbusClient calls to its address skip TCP.
+
+The controllers only ever read/write a handful of registers at fixed
+addresses, one outstanding request per connection.  That needs none of
+pymodbus's transaction manager / framer machinery, which dominates the
+per-request cost.  One-shot tools (clients/*) keep using pymodbus.
+
+On the server side, every controller tick and every external poll is an
+FC03/FC04 read.  pymodbus decodes each into PDU objects, hops through
+call_soon + a coroutine, then re-encodes the response; the fast handler
+answers a buffer holding exactly one such read synchronously, straight
+from the datastore.  Everything else falls through to pymodbus.
+
+When several devices share one process (plant.py --single-process, see
+tcp_utils.serve_in_process), serve_tcp registers each context under its
+address; a FastModbusClient pointed at a registered address calls the
+context's getValues/setValues directly instead of framing a request over
+localhost.  One-device-per-process servers register nothing.
+
+Client error model mirrors how the controllers already use pymodbus:
+- Modbus exception response → method returns None / False.
+- Socket error, timeout, or malformed frame → exception; the caller
+  calls close() and the next request reconnects.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from pymodbus.constants import ExcCodes
+from pymodbus.exceptions import NoSuchIdException
+from pymodbus.server import ModbusTcpServer
+from pymodbus.server.requesthandler import ServerRequestHandler
+
+FC_READ_HOLDING   = 0x03
+FC_READ_INPUT     = 0x04
+FC_WRITE_MULTIPLE = 0x10
+
+# MBAP header: transaction id, protocol id (0), length, unit id
+_MBAP = struct.Struct(">HHHB")
+# MBAP + FC03/FC04 request PDU: function, start address, quantity
+_READ_REQ = struct.Struct(">HHHBBHH")
+# MBAP + FC16 request PDU header: function, start address, quantity, byte count
+_WRITE_REQ_HEAD = struct.Struct(">HHHBBHHB")
+# MBAP + FC03/FC04 response PDU header: function, byte count
+_READ_RESP_HEAD = struct.Struct(">HHHBBB")
+
+MAX_READ_COUNT = 125  # Modbus limit for FC03/FC04 quantity (FC16: 123)
+
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+# Contexts served by this process: {(host, port): ModbusServerContext}
+_LOCAL_SERVERS: Dict[Tuple[str, int], object] = {}
+
+
+def register_local_server(address: Tuple[str, int], server_ctx) -> None:
+    """Route FastModbusClient requests for ``address`` to ``server_ctx`` in-process."""
+    _LOCAL_SERVERS[tuple(address)] = server_ctx
+
+
+def unregister_local_server(address: Tuple[str, int]) -> None:
+    _LOCAL_SERVERS.pop(tuple(address), None)
+
+# Big-endian uint16 runs, precompiled per register count: _REGS[n] is ">nH"
+_REGS = [struct.Struct(f">{n}H") for n in range(MAX_READ_COUNT + 1)]
+
+
+class FastModbusClient:
+    """Persistent Modbus TCP connection with raw request/response framing."""
+
+    def __init__(self, host: str, port: int, unit_id: int = 0,
+                 timeout_s: float = 3.0) -> None:
+        self.host = host
+        self.port = port
+        self.unit_id = unit_id
+        self.timeout_s = timeout_s
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._tid = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout_s,
+        )
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+
+    def _next_tid(self) -> int:
+        self._tid = (self._tid + 1) & 0xFFFF
+        return self._tid
+
+    async def _recv_frame(self) -> tuple:
+        """Read one response frame: (tid, protocol id, PDU).
+
+        Both reads come out of the StreamReader's own receive buffer, so a
+        fragmented response costs no extra copies here, and the pair runs
+        under a single timeout in _transact.
+        """
+        r_tid, r_proto, r_len, _unit = _MBAP.unpack(await self._reader.readexactly(_MBAP.size))
+        return r_tid, r_proto, await self._reader.readexactly(r_len - 1)
+
+    async def _transact(self, request: bytes, tid: int, fc: int) -> Optional[bytes]:
+        """Send one request, return the response PDU (FC at offset 0), or None on exception."""
+        if not self.connected:
+            await self.connect()
+        self._writer.write(request)
+        r_tid, r_proto, pdu = await asyncio.wait_for(self._recv_frame(), self.timeout_s)
+        if r_tid != tid or r_proto != 0 or not pdu:
+            raise ConnectionError(f"unexpected Modbus frame from {self.host}:{self.port}")
+        r_fc = pdu[0]
+        if r_fc == fc | 0x80:
+            return None  # exception response
+        if r_fc != fc:
+            raise ConnectionError(f"unexpected function code {r_fc} from {self.host}:{self.port}")
+        return pdu
+
+    def _local_device(self, server_ctx):
+        """The in-process device context for unit_id (a missing unit is a
+        transport-level failure, as a TCP server would not answer)."""
+        try:
+            return server_ctx[self.unit_id]
+        except NoSuchIdException:
+            raise ConnectionError(f"no unit {self.unit_id} at {self.host}:{self.port}") from None
+
+    async def _read(self, fc: int, address: int, count: int) -> Optional[List[int]]:
+        local = _LOCAL_SERVERS.get((self.host, self.port))
+        if local is not None:
+            values = self._local_device(local).getValues(fc, address, count)
+            return None if isinstance(values, ExcCodes) else list(values)
+        tid = self._next_tid()
+        request = _READ_REQ.pack(tid, 0, 6, self.unit_id, fc, address, count)
+        pdu = await self._transact(request, tid, fc)
+        if pdu is None:
+            return None
+        if pdu[1] != 2 * count or len(pdu) != 2 + 2 * count:
+            raise ConnectionError(f"short Modbus read from {self.host}:{self.port}")
+        return list(_REGS[count].unpack_from(pdu, 2))  # registers follow FC + byte count
+
+    async def read_holding_registers(self, address: int, count: int = 1) -> Optional[List[int]]:
+        """FC03. Returns the registers, or None on a Modbus exception response."""
+        return await self._read(FC_READ_HOLDING, address, count)
+
+    async def read_input_registers(self, address: int, count: int = 1) -> Optional[List[int]]:
+        """FC04. Returns the registers, or None on a Modbus exception response."""
+        return await self._read(FC_READ_INPUT, address, count)
+
+    async def write_registers(self, address: int, values: List[int]) -> bool:
+        """FC16. Returns False on a Modbus exception response."""
+        local = _LOCAL_SERVERS.get((self.host, self.port))
+        if local is not None:
+            result = self._local_device(local).setValues(FC_WRITE_MULTIPLE, address, list(values))
+            return not isinstance(result, ExcCodes)
+        count = len(values)
+        tid = self._next_tid()
+        request = _WRITE_REQ_HEAD.pack(
+            tid, 0, 7 + 2 * count, self.unit_id,
+            FC_WRITE_MULTIPLE, address, count, 2 * count,
+        ) + _REGS[count].pack(*values)
+        return await self._transact(request, tid, FC_WRITE_MULTIPLE) is not None
+
+
+class FastReadRequestHandler(ServerRequestHandler):
+    """Server connection handler with a direct path for FC03/FC04 reads.
+
+    A receive buffer holding exactly one well-formed read request is
+    parsed with a precompiled struct, served from the device context's
+    getValues (the same call pymodbus makes) and answered with a single
+    transport write.  Partial or pipelined buffers, other function codes,
+    exception cases (bad address, unknown unit, broadcast) and packet/PDU
+    tracing all go through pymodbus unchanged.
+    """
+
+    def __init__(self, owner, trace_packet, trace_pdu, trace_connect):
+        super().__init__(owner, trace_packet, trace_pdu, trace_connect)
+        self._fast_ok = trace_packet is None and trace_pdu is None
+
+    def callback_data(self, data: bytes, addr: tuple | None = None) -> int:
+        if self._fast_ok and len(data) == _READ_REQ.size:
+            tid, proto, length, unit, fc, address, count = _READ_REQ.unpack(data)
+            if (proto == 0 and length == 6
+                    and (fc == FC_READ_HOLDING or fc == FC_READ_INPUT)
+                    and 1 <= count <= MAX_READ_COUNT
+                    and not (unit == 0 and self.server.broadcast_enable)):
+                try:
+                    values = self.server.context[unit].getValues(fc, address, count)
+                except NoSuchIdException:
+                    values = None
+                if values is not None and not isinstance(values, ExcCodes):
+                    # Copy into our own array('H') (a C copy for both array
+                    # and list results), swap it to network order and append
+                    # its buffer.  The copy keeps a datastore that returns
+                    # its live array from being byte-swapped in place.
+                    regs = array("H", values)
+                    if _NATIVE_LITTLE_ENDIAN:
+                        regs.byteswap()
+                    frame = bytearray(_READ_RESP_HEAD.pack(
+                        tid, 0, 3 + 2 * count, unit, fc, 2 * count))
+                    frame += regs
+                    self.send(frame)
+                    return len(data)
+        return super().callback_data(data, addr)
+
+
+class FastReadTcpServer(ModbusTcpServer):
+    """ModbusTcpServer whose connections use FastReadRequestHandler."""
+
+    def callback_new_connection(self):
+        return FastReadRequestHandler(
+            self, self.trace_packet, self.trace_pdu, self.trace_connect,
+        )
@@ -12,15 +12,9 @@ Address layout (Huawei PCS2000HA full map):
 from __future__ import annotations
 
 import logging
-import sys
-import os
 
-from pymodbus.server import StartTcpServer
-
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-from tcp_context import build_multirange_server_context
+from tcp_servers.tcp_context import build_multirange_server_context
+from tcp_servers.tcp_utils import run_event_loop, serve_tcp
 from specs.pcs_registers import (
     STATIC_RANGE_START,
     STATIC_RANGE_SIZE,
@@ -42,7 +36,7 @@ logging.basicConfig(
 log = logging.getLogger("pcs_server")
 
 
-def run_pcs_server(
+async def serve_pcs_server(
     device_name: str,
     host: str,
     port: int,
@@ -52,12 +46,12 @@ def run_pcs_server(
     transducer_host: str = "",
     transducer_port: int = 0,
 ) -> None:
-    """Start a PCS TCP server and its controller thread."""
+    """Start a PCS TCP server and its controller task."""
 
     # Build Huawei static init data (identity + rating)
     static_init = build_static_init(overrides={"sn": f"SIM-{device_name}"})
 
-    server_ctx, stores, lock = build_multirange_server_context(
+    server_ctx, stores = build_multirange_server_context(
         hr_ranges=[
             (CONTROL_RANGE_START, CONTROL_RANGE_SIZE, {}),         # HR 40039-40044: control
         ],
@@ -70,23 +64,49 @@ def run_pcs_server(
         slave_id=0,
     )
 
-    from controllers.pcs_controller import start_pcs_controller
-    ctrl_thread, ctrl_stop = start_pcs_controller(
+    from controllers.pcs_controller import start_pcs_controller_async
+    ctrl_task, ctrl_stop = start_pcs_controller_async(
         device_name=device_name,
         stores=stores,
-        lock=lock,
         paired_bms_host=paired_bms_host,
         paired_bms_port=paired_bms_port,
         transducer_host=transducer_host,
         transducer_port=transducer_port,
         tick_interval_s=tick_interval_s,
     )
-    log.info(f"{device_name} controller thread started (tick={tick_interval_s}s)")
-    log.info(f"{device_name} Huawei registers: IR {STATIC_RANGE_START}-{STATIC_RANGE_START + STATIC_RANGE_SIZE - 1} (static), "
-             f"IR {POWER_RANGE_START}-{POWER_RANGE_START + POWER_RANGE_SIZE - 1} (power), "
-             f"HR {CONTROL_RANGE_START}-{CONTROL_RANGE_START + CONTROL_RANGE_SIZE - 1} (control)")
-    log.info(f"{device_name} unit_id=0, TCP server listening on {host}:{port}")
-    StartTcpServer(server_ctx, address=(host, port))
+    log.info("%s controller task started (tick=%ss)", device_name, tick_interval_s)
+    log.info(
+        "%s Huawei registers: IR %d-%d (static), IR %d-%d (power), HR %d-%d (control)",
+        device_name,
+        STATIC_RANGE_START, STATIC_RANGE_START + STATIC_RANGE_SIZE - 1,
+        POWER_RANGE_START, POWER_RANGE_START + POWER_RANGE_SIZE - 1,
+        CONTROL_RANGE_START, CONTROL_RANGE_START + CONTROL_RANGE_SIZE - 1,
+    )
+    log.info("%s unit_id=0, TCP server listening on %s:%s", device_name, host, port)
+    await serve_tcp(server_ctx, (host, port))
+
+
+def run_pcs_server(
+    device_name: str,
+    host: str,
+    port: int,
+    paired_bms_host: str,
+    paired_bms_port: int,
+    tick_interval_s: float,
+    transducer_host: str = "",
+    transducer_port: int = 0,
+) -> None:
+    """Blocking entry point: serve_pcs_server on its own event loop."""
+    run_event_loop(serve_pcs_server(
+        device_name=device_name,
+        host=host,
+        port=port,
+        paired_bms_host=paired_bms_host,
+        paired_bms_port=paired_bms_port,
+        tick_interval_s=tick_interval_s,
+        transducer_host=transducer_host,
+        transducer_port=transducer_port,
+    ))
 
 
 if __name__ == "__main__":
@@ -13,22 +13,15 @@ Simulator extension:
   HR 40424 = demand_direction (0=discharge, 1=charge).
   Real spec uses 40424 as "Active adjustment (alternative)" U32.
 
-Runs the PMS controller loop in a background thread within this process.
+Runs the PMS controller as a task on the server's event loop.
 """
 
 from __future__ import annotations
 
 import logging
-import sys
-import os
 
-from pymodbus.server import StartTcpServer
-
-# Allow imports when running as subprocess from project root
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-from tcp_context import build_multirange_server_context
+from tcp_servers.tcp_context import build_multirange_server_context
+from tcp_servers.tcp_utils import run_event_loop, serve_tcp
 from specs.pms_registers import (
     CONTROL_RANGE_START,
     CONTROL_RANGE_SIZE,
@@ -48,7 +41,7 @@ logging.basicConfig(
 log = logging.getLogger("pms_server")
 
 
-def run_pms_server(
+async def serve_pms_server(
     host: str,
     port: int,
     pcs_ports: dict[str, int],
@@ -59,7 +52,7 @@ def run_pms_server(
     suppression_host: str = "",
     suppression_port: int = 0,
 ) -> None:
-    """Start the PMS TCP server and its controller thread."""
+    """Start the PMS TCP server and its controller task."""
 
     # Build init values for all HR ranges
     all_init = build_static_init()
@@ -68,7 +61,7 @@ def run_pms_server(
     def _pick(start, size):
         return {k: v for k, v in all_init.items() if start <= k < start + size}
 
-    server_ctx, stores, lock = build_multirange_server_context(
+    server_ctx, stores = build_multirange_server_context(
         hr_ranges=[
             (CONTROL_RANGE_START, CONTROL_RANGE_SIZE, _pick(CONTROL_RANGE_START, CONTROL_RANGE_SIZE)),
             (TELEMETRY_RANGE_START, TELEMETRY_RANGE_SIZE, _pick(TELEMETRY_RANGE_START, TELEMETRY_RANGE_SIZE)),
@@ -78,11 +71,9 @@ def run_pms_server(
         slave_id=0,
     )
 
-    # Start controller thread
-    from controllers.pms_controller import start_pms_controller
-    ctrl_thread, ctrl_stop = start_pms_controller(
+    from controllers.pms_controller import start_pms_controller_async
+    ctrl_task, ctrl_stop = start_pms_controller_async(
         stores=stores,
-        lock=lock,
         host=host,
         pcs_ports=pcs_ports,
         bms_ports=bms_ports,
@@ -91,7 +82,7 @@ def run_pms_server(
         suppression_host=suppression_host,
         suppression_port=suppression_port,
     )
-    log.info(f"PMS controller thread started (tick={tick_interval_s}s)")
+    log.info("PMS controller task started (tick=%ss)", tick_interval_s)
 
     log.info(
         "PMS Huawei registers: HR %d-%d (control), HR %d-%d (telemetry), "
@@ -101,8 +92,32 @@ def run_pms_server(
         IDENTITY_RANGE_START, IDENTITY_RANGE_START + IDENTITY_RANGE_SIZE - 1,
         ALARM_RANGE_START, ALARM_RANGE_START + ALARM_RANGE_SIZE - 1,
     )
-    log.info(f"PMS unit_id=0, TCP server listening on {host}:{port}")
-    StartTcpServer(server_ctx, address=(host, port))
+    log.info("PMS unit_id=0, TCP server listening on %s:%s", host, port)
+    await serve_tcp(server_ctx, (host, port))
+
+
+def run_pms_server(
+    host: str,
+    port: int,
+    pcs_ports: dict[str, int],
+    bms_ports: dict[str, int],
+    pairing: dict[str, str],
+    tick_interval_s: float,
+    *,
+    suppression_host: str = "",
+    suppression_port: int = 0,
+) -> None:
+    """Blocking entry point: serve_pms_server on its own event loop."""
+    run_event_loop(serve_pms_server(
+        host=host,
+        port=port,
+        pcs_ports=pcs_ports,
+        bms_ports=bms_ports,
+        pairing=pairing,
+        tick_interval_s=tick_interval_s,
+        suppression_host=suppression_host,
+        suppression_port=suppression_port,
+    ))
 
 
 if __name__ == "__main__":
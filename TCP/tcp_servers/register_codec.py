@@ -114,7 +114,7 @@ def decode_u16(regs: List[int], gain: int = 1) -> Union[int, float]:
 
 def decode_i16(regs: List[int], gain: int = 1) -> Union[int, float]:
     raw = regs[0]
-    raw = raw - 0x10000 if raw >= 0x8000 else raw
+    raw = (raw ^ 0x8000) - 0x8000  # branchless sign extension
     return raw / gain if gain != 1 else raw
 
 
@@ -125,8 +125,7 @@ def decode_u32(regs: List[int], gain: int = 1) -> Union[int, float]:
 
 def decode_i32(regs: List[int], gain: int = 1) -> Union[int, float]:
     raw = (regs[0] << 16) | regs[1]
-    if raw >= 0x8000_0000:
-        raw -= 0x1_0000_0000
+    raw = (raw ^ 0x8000_0000) - 0x8000_0000
     return raw / gain if gain != 1 else raw
 
 
@@ -137,8 +136,7 @@ def decode_u64(regs: List[int], gain: int = 1) -> Union[int, float]:
 
 def decode_i64(regs: List[int], gain: int = 1) -> Union[int, float]:
     raw = (regs[0] << 48) | (regs[1] << 32) | (regs[2] << 16) | regs[3]
-    if raw >= (1 << 63):
-        raw -= (1 << 64)
+    raw = (raw ^ (1 << 63)) - (1 << 63)
     return raw / gain if gain != 1 else raw
 
 
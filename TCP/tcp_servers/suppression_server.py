@@ -11,15 +11,9 @@ PMS reads HR0 each tick to enforce discharge suppression.
 from __future__ import annotations
 
 import logging
-import sys
-import os
 
-from pymodbus.server import StartTcpServer
-
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-from tcp_context import build_tcp_server_context
+from tcp_servers.tcp_context import build_tcp_server_context
+from tcp_servers.tcp_utils import run_event_loop, serve_tcp
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,7 +22,7 @@ logging.basicConfig(
 log = logging.getLogger("suppression_server")
 
 
-def run_suppression_server(
+async def serve_suppression_server(
     device_name: str,
     host: str,
     port: int,
@@ -37,15 +31,28 @@ def run_suppression_server(
 
     hr_init = {0: 100}  # suppression_percent default = 100 (no suppression)
 
-    server_ctx, stores, lock = build_tcp_server_context(
+    server_ctx, _ = build_tcp_server_context(
         hr_size=10, ir_size=0,
         hr_init=hr_init, ir_init=None,
         slave_id=0,
     )
 
-    log.info(f"{device_name} TCP server listening on {host}:{port}")
-    log.info(f"{device_name} HR0 = suppression_percent (default=100, range 0-100)")
-    StartTcpServer(server_ctx, address=(host, port))
+    log.info("%s TCP server listening on %s:%s", device_name, host, port)
+    log.info("%s HR0 = suppression_percent (default=100, range 0-100)", device_name)
+    await serve_tcp(server_ctx, (host, port))
+
+
+def run_suppression_server(
+    device_name: str,
+    host: str,
+    port: int,
+) -> None:
+    """Blocking entry point: serve_suppression_server on its own event loop."""
+    run_event_loop(serve_suppression_server(
+        device_name=device_name,
+        host=host,
+        port=port,
+    ))
 
 
 if __name__ == "__main__":
@@ -1,9 +1,9 @@
 """
-Shared helpers for building Modbus TCP server contexts and locked datastores.
+Shared helpers for building Modbus TCP server contexts and array-backed datastores.
 
 Provides:
-- LockedDataBlock:              Thread-safe 0-based ModbusSequentialDataBlock.
-- MultiRangeDataBlock:          Thread-safe multi-range DataBlock for Huawei addresses.
+- ArrayDataBlock:               Lock-free array-backed 0-based DataBlock.
+- MultiRangeDataBlock:          Lock-free array-backed multi-range DataBlock for Huawei addresses.
 - RejectAllDataBlock:           Returns ILLEGAL_ADDRESS for unsupported function codes.
 - ZeroBasedDeviceContext:       Cancels pymodbus 3.x implicit +1 on address.
 - build_tcp_server_context:     Factory for single-device 0-based context.
@@ -13,8 +13,9 @@ Provides:
 
 from __future__ import annotations
 
-import threading
-from typing import Dict, List, Optional, Tuple
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from pymodbus.datastore import (
     ModbusDeviceContext,
@@ -28,25 +29,38 @@ from pymodbus.datastore.store import ExcCodes
 # DataBlock classes
 # ---------------------------------------------------------------------------
 
-class LockedDataBlock(ModbusSequentialDataBlock):
-    """Thread-safe 0-based datablock guarded by an RLock."""
+class ArrayDataBlock(ModbusSequentialDataBlock):
+    """0-based datablock backed by an ``array('H')`` (packed uint16).
 
-    def __init__(self, lock: threading.RLock, size: int,
-                 init_values: Optional[Dict[int, int]] = None):
-        values = [0] * size
+    No lock: every getValues/setValues is a single array slice copy or
+    slice assignment, which CPython performs atomically under the GIL, so
+    a reader never sees a half-written multi-register value.
+    """
+
+    def __init__(self, size: int, init_values: Optional[Dict[int, int]] = None):
+        """
+        Args:
+            size:        number of registers (addresses 0..size-1).
+            init_values: {addr: uint16} initial values.
+        """
+        super().__init__(0, [0])  # dummy init for parent
+        self.values = array("H", bytes(2 * size))
         if init_values:
             for addr, u16 in init_values.items():
-                values[addr] = u16
-        super().__init__(0, values)
-        self._lock = lock
+                self.values[addr] = u16
 
-    def getValues(self, address: int, count: int = 1) -> List[int]:
-        with self._lock:
-            return super().getValues(address, count)
+    def getValues(self, address: int, count: int = 1):
+        if address < 0 or len(self.values) < address + count:
+            return ExcCodes.ILLEGAL_ADDRESS
+        return self.values[address:address + count]
 
-    def setValues(self, address: int, values: List[int]) -> None:
-        with self._lock:
-            return super().setValues(address, values)
+    def setValues(self, address: int, values: Sequence[int]):
+        if isinstance(values, int):
+            values = [values]
+        if address < 0 or len(self.values) < address + len(values):
+            return ExcCodes.ILLEGAL_ADDRESS
+        self.values[address:address + len(values)] = array("H", values)
+        return None
 
 
 class RejectAllDataBlock(ModbusSequentialDataBlock):
@@ -59,13 +73,21 @@ class RejectAllDataBlock(ModbusSequentialDataBlock):
         return ExcCodes.ILLEGAL_ADDRESS
 
 
+# Stateless, so one instance serves every unsupported slot of every device
+_REJECT_ALL = RejectAllDataBlock(0, [0])
+
+
 class MultiRangeDataBlock(ModbusSequentialDataBlock):
     """DataBlock supporting multiple non-contiguous address ranges.
 
-    Each range is a contiguous island of registers backed by a small list.
-    Reads/writes that fall entirely within one range succeed.
+    Each range is a contiguous island of registers backed by an
+    ``array('H')`` (packed uint16).  Reads/writes that fall entirely within
+    one range succeed.
     Addresses outside any range or crossing range boundaries → ILLEGAL_ADDRESS.
 
+    No lock, for the same reason as ArrayDataBlock: every getValues/setValues
+    is a single atomic array slice operation.
+
     Example:
         ranges = [
             (30000, 85),                          # identity+rating, 85 regs
@@ -74,11 +96,9 @@ class MultiRangeDataBlock(ModbusSequentialDataBlock):
         ]
     """
 
-    def __init__(self, lock: threading.RLock,
-                 ranges: List[tuple]) -> None:
+    def __init__(self, ranges: List[tuple]) -> None:
         super().__init__(0, [0])  # dummy init for parent
-        self._lock = lock
-        self._ranges: Dict[int, Dict] = {}  # {start: {"size": n, "values": [...]}}
+        self._ranges: Dict[int, Dict] = {}  # {start: {"size": n, "values": array('H')}}
 
         for r in ranges:
             if len(r) == 3:
@@ -86,7 +106,7 @@ class MultiRangeDataBlock(ModbusSequentialDataBlock):
             else:
                 start, size = r
                 init_vals = None
-            values = [0] * size
+            values = array("H", bytes(2 * size))
             if init_vals:
                 for addr, val in init_vals.items():
                     offset = addr - start
@@ -106,21 +126,21 @@ class MultiRangeDataBlock(ModbusSequentialDataBlock):
         return start is not None
 
     def getValues(self, address: int, count: int = 1):
-        with self._lock:
-            start, rng = self._find_range(address, count)
-            if start is None:
-                return ExcCodes.ILLEGAL_ADDRESS
-            offset = address - start
-            return list(rng["values"][offset: offset + count])
-
-    def setValues(self, address: int, values: List[int]):
-        with self._lock:
-            count = len(values)
-            start, rng = self._find_range(address, count)
-            if start is None:
-                return ExcCodes.ILLEGAL_ADDRESS
-            offset = address - start
-            rng["values"][offset: offset + count] = values
+        start, rng = self._find_range(address, count)
+        if start is None:
+            return ExcCodes.ILLEGAL_ADDRESS
+        offset = address - start
+        return rng["values"][offset: offset + count]
+
+    def setValues(self, address: int, values: Sequence[int]):
+        if isinstance(values, int):
+            values = [values]
+        count = len(values)
+        start, rng = self._find_range(address, count)
+        if start is None:
+            return ExcCodes.ILLEGAL_ADDRESS
+        offset = address - start
+        rng["values"][offset: offset + count] = array("H", values)
 
 
 # ---------------------------------------------------------------------------
@@ -133,6 +153,8 @@ class ZeroBasedDeviceContext(ModbusDeviceContext):
 
     pymodbus 3.x parent does ``address += 1`` in getValues/setValues.
     We skip that so protocol address 0 → DataBlock index 0.
+    async_getValues/async_setValues delegate to these sync methods via
+    MRO, so they also get the fix.
     """
 
     def getValues(self, func_code: int, address: int, count: int = 1):
@@ -153,55 +175,71 @@ def _int16_to_u16(x: int) -> int:
 
 def _u16_to_int16(x: int) -> int:
     """Unsigned uint16 → signed int16."""
-    return x - 0x10000 if x >= 0x8000 else x
+    return (x ^ 0x8000) - 0x8000
+
+
+# Decode lookup tables: the input domain is 16 bits, so every decoded value
+# is precomputed once at import (float64, identical to the arithmetic form).
+_POWER_KW_LUT = array("d", (_u16_to_int16(u) * 0.1 for u in range(0x10000)))
+_CAPACITY_KWH_LUT = array("d", (u * 0.1 for u in range(0x10000)))
 
 
+# The encoders round half away from zero with an int() truncation instead
+# of calling round(); they only differ from round() on exact .5 ties.
+# The decoders take register values, which are uint16 by construction, so
+# they do not mask; the range is asserted instead (stripped under -O).
+
 def encode_power_kw(kw: float) -> int:
     """kW (float, scale 0.1) → uint16 (two's complement)."""
-    raw = int(round(kw / 0.1))
-    return _int16_to_u16(raw)
+    return int(kw * 10 + (0.5 if kw >= 0 else -0.5)) & 0xFFFF  # _int16_to_u16, inlined
 
 
 def decode_power_kw(reg_u16: int) -> float:
     """uint16 → kW float (scale 0.1, signed)."""
-    return _u16_to_int16(reg_u16 & 0xFFFF) * 0.1
+    assert 0 <= reg_u16 <= 0xFFFF, reg_u16
+    return _POWER_KW_LUT[reg_u16]
 
 
 def encode_soc(percent: float) -> int:
     """SOC % → uint16, scale=1, clamp [0,100]."""
-    return int(round(max(0.0, min(100.0, percent)))) & 0xFFFF
+    return 0 if percent < 0 else 100 if percent > 100 else int(percent + 0.5)
 
 
 def decode_soc(reg_u16: int) -> float:
-    return float(reg_u16 & 0xFFFF)
+    assert 0 <= reg_u16 <= 0xFFFF, reg_u16
+    return float(reg_u16)
 
 
+@lru_cache(maxsize=64)  # SOH is (near-)static: same input every tick
 def encode_soh(percent: float) -> int:
-    return int(round(max(0.0, min(100.0, percent)))) & 0xFFFF
+    return 0 if percent < 0 else 100 if percent > 100 else int(percent + 0.5)
 
 
 def decode_soh(reg_u16: int) -> float:
-    return float(reg_u16 & 0xFFFF)
+    assert 0 <= reg_u16 <= 0xFFFF, reg_u16
+    return float(reg_u16)
 
 
+@lru_cache(maxsize=64)  # capacity is static: same input every tick
 def encode_capacity_kwh(kwh: float) -> int:
     """Capacity kWh → uint16, scale=0.1, clamp ≥ 0."""
-    raw = int(round(max(0.0, kwh) / 0.1))
-    return raw & 0xFFFF
+    return int(kwh * 10 + 0.5) & 0xFFFF if kwh > 0 else 0
 
 
 def decode_capacity_kwh(reg_u16: int) -> float:
-    return (reg_u16 & 0xFFFF) * 0.1
+    assert 0 <= reg_u16 <= 0xFFFF, reg_u16
+    return _CAPACITY_KWH_LUT[reg_u16]
 
 
 def encode_frequency_hz(hz: float) -> int:
     """Frequency Hz → uint16, scale 0.001 Hz (50.000 Hz → 50000)."""
-    return int(round(max(0.0, hz) / 0.001)) & 0xFFFF
+    return int(hz * 1000 + 0.5) & 0xFFFF if hz > 0 else 0
 
 
 def decode_frequency_hz(reg_u16: int) -> float:
     """uint16 → frequency Hz (scale 0.001)."""
-    return (reg_u16 & 0xFFFF) * 0.001
+    assert 0 <= reg_u16 <= 0xFFFF, reg_u16
+    return reg_u16 * 0.001
 
 
 # ---------------------------------------------------------------------------
@@ -215,28 +253,26 @@ def build_tcp_server_context(
     hr_init: Optional[Dict[int, int]] = None,
     ir_init: Optional[Dict[int, int]] = None,
     slave_id: int = 1,
-) -> Tuple[ModbusServerContext, Dict[str, LockedDataBlock], threading.RLock]:
+) -> Tuple[ModbusServerContext, Dict[str, ArrayDataBlock]]:
     """
     Build a single-slave Modbus server context.
 
     Returns:
-        (server_context, {"hr": block, "ir": block}, lock)
+        (server_context, {"hr": block, "ir": block})
     """
-    lock = threading.RLock()
-
-    hr = LockedDataBlock(lock, hr_size, hr_init) if hr_size > 0 else RejectAllDataBlock(0, [0])
-    ir = LockedDataBlock(lock, ir_size, ir_init) if ir_size > 0 else RejectAllDataBlock(0, [0])
+    hr = ArrayDataBlock(hr_size, hr_init) if hr_size > 0 else _REJECT_ALL
+    ir = ArrayDataBlock(ir_size, ir_init) if ir_size > 0 else _REJECT_ALL
 
     device_ctx = ZeroBasedDeviceContext(
-        di=RejectAllDataBlock(0, [0]),
-        co=RejectAllDataBlock(0, [0]),
+        di=_REJECT_ALL,
+        co=_REJECT_ALL,
         hr=hr,
         ir=ir,
     )
 
     server_ctx = ModbusServerContext(devices={slave_id: device_ctx}, single=False)
     stores = {"hr": hr, "ir": ir}
-    return server_ctx, stores, lock
+    return server_ctx, stores
 
 
 def build_multirange_server_context(
@@ -244,7 +280,7 @@ def build_multirange_server_context(
     hr_ranges: Optional[List[tuple]] = None,
     ir_ranges: Optional[List[tuple]] = None,
     slave_id: int = 1,
-) -> Tuple[ModbusServerContext, Dict[str, MultiRangeDataBlock], threading.RLock]:
+) -> Tuple[ModbusServerContext, Dict[str, MultiRangeDataBlock]]:
     """Build a server context using MultiRangeDataBlock for Huawei-style addresses.
 
     Args:
@@ -253,26 +289,24 @@ def build_multirange_server_context(
         slave_id:  Modbus unit id (default 1)
 
     Returns:
-        (server_context, {"hr": block, "ir": block}, lock)
+        (server_context, {"hr": block, "ir": block})
 
     Example:
-        ctx, stores, lock = build_multirange_server_context(
+        ctx, stores = build_multirange_server_context(
             hr_ranges=[(40039, 163)],
             ir_ranges=[(30000, 85), (32000, 91)],
         )
     """
-    lock = threading.RLock()
-
-    hr = MultiRangeDataBlock(lock, hr_ranges) if hr_ranges else RejectAllDataBlock(0, [0])
-    ir = MultiRangeDataBlock(lock, ir_ranges) if ir_ranges else RejectAllDataBlock(0, [0])
+    hr = MultiRangeDataBlock(hr_ranges) if hr_ranges else _REJECT_ALL
+    ir = MultiRangeDataBlock(ir_ranges) if ir_ranges else _REJECT_ALL
 
     device_ctx = ZeroBasedDeviceContext(
-        di=RejectAllDataBlock(0, [0]),
-        co=RejectAllDataBlock(0, [0]),
+        di=_REJECT_ALL,
+        co=_REJECT_ALL,
         hr=hr,
         ir=ir,
     )
 
     server_ctx = ModbusServerContext(devices={slave_id: device_ctx}, single=False)
     stores = {"hr": hr, "ir": ir}
-    return server_ctx, stores, lock
+    return server_ctx, stores
@@ -0,0 +1,119 @@
+"""
+Socket and event-loop helpers for the Modbus TCP clients and servers.
+
+Provides:
+- NoDelayModbusTcpClient: ModbusTcpClient with TCP_NODELAY set on every connect.
+- make_nodelay_client:    Factory used wherever a sync client is constructed.
+- run_event_loop:         Run a coroutine on uvloop when installed, else asyncio.
+- serve_tcp:              Coroutine serving one context on the running loop.
+- serve_in_process:       Context flag: serve_tcp also registers for in-process routing.
+- run_tcp_server:         Blocking wrapper: serve_tcp on its own event loop.
+- next_deadline:          Fixed-period loop pacing against time.monotonic().
+
+Async clients (AsyncModbusTcpClient) need nothing here: asyncio already
+enables TCP_NODELAY on every TCP transport it creates.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import socket
+import time
+from contextvars import ContextVar
+from typing import Any, Coroutine, Tuple
+
+from pymodbus.client import ModbusTcpClient
+
+from tcp_servers.fast_modbus import (
+    FastReadTcpServer,
+    register_local_server,
+    unregister_local_server,
+)
+
+try:  # optional: libuv-based event loop, not available on Windows
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Set by a process serving several devices on one loop (Plant.serve_all);
+# serve_tcp calls in that context register their context for in-process
+# routing.  Unset everywhere else, so one-device-per-process servers are
+# only ever reached over TCP.
+serve_in_process: ContextVar[bool] = ContextVar("serve_in_process", default=False)
+
+
+class NoDelayModbusTcpClient(ModbusTcpClient):
+    """ModbusTcpClient with Nagle's algorithm disabled.
+
+    Modbus requests are a dozen bytes; with Nagle on, a write can sit in the
+    kernel waiting for the peer's delayed ACK (~40 ms).  pymodbus opens a new
+    socket on every (re)connect, so the option is applied in connect().
+    """
+
+    def connect(self) -> bool:
+        ok = super().connect()
+        if self.socket is not None:
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return ok
+
+
+def make_nodelay_client(host: str, port: int) -> NoDelayModbusTcpClient:
+    """Build a sync Modbus TCP client with TCP_NODELAY enabled."""
+    return NoDelayModbusTcpClient(host, port=port)
+
+
+def run_event_loop(main: Coroutine[Any, Any, None]) -> None:
+    """Run ``main`` to completion on a fresh event loop.
+
+    Uses uvloop's loop when it is importable, asyncio's default otherwise.
+    """
+    if uvloop is None:
+        asyncio.run(main)
+    else:
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(main)
+
+
+async def serve_tcp(server_ctx, address: Tuple[str, int], *, identity=None) -> None:
+    """Serve ``server_ctx`` on ``address`` on the running loop, forever.
+
+    Uses a server object directly rather than StartAsyncTcpServer, which
+    pymodbus documents as single-server only, so several devices can be
+    served from one loop.  FastReadTcpServer answers plain register reads
+    without pymodbus's PDU round trip.  When serve_in_process is set, the
+    context is also registered once the listener is bound, so
+    FastModbusClients of devices on the same loop reach it without a TCP
+    round trip; a failed bind raises without ever routing peers to it.
+    """
+    local = serve_in_process.get()
+    server = FastReadTcpServer(server_ctx, address=address, identity=identity)
+    await server.serve_forever(background=True)  # returns once listening
+    if local:
+        register_local_server(address, server_ctx)
+    try:
+        with contextlib.suppress(asyncio.CancelledError):  # as serve_forever()
+            await server.serving
+    finally:
+        if local:
+            unregister_local_server(address)
+        await server.shutdown()
+
+
+def run_tcp_server(server_ctx, address: Tuple[str, int], *, identity=None) -> None:
+    """Blocking: serve ``server_ctx`` on ``address`` on its own event loop."""
+    run_event_loop(serve_tcp(server_ctx, address, identity=identity))
+
+
+def next_deadline(deadline: float, interval: float) -> Tuple[float, float]:
+    """Pace a fixed-period loop: returns (sleep_s, following deadline).
+
+    Loops sleep to a monotonic deadline rather than for ``interval``, so
+    the loop body doesn't stretch the period.  A loop that has fallen
+    behind gets sleep_s = 0 and a deadline one interval from now, so it
+    does not burst to catch up.
+    """
+    now = time.monotonic()
+    if deadline > now:
+        return deadline - now, deadline + interval
+    return 0.0, now + interval
@@ -10,18 +10,12 @@ Read-only device (no holding registers).
 from __future__ import annotations
 
 import logging
-import sys
-import os
 
-from pymodbus.server import StartTcpServer
-
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-from tcp_context import (
+from tcp_servers.tcp_context import (
     build_tcp_server_context,
     encode_frequency_hz,
 )
+from tcp_servers.tcp_utils import run_event_loop, serve_tcp
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,7 +24,7 @@ logging.basicConfig(
 log = logging.getLogger("transducer_server")
 
 
-def run_transducer_server(
+async def serve_transducer_server(
     device_name: str,
     host: str,
     port: int,
@@ -42,7 +36,7 @@ def run_transducer_server(
         0: encode_frequency_hz(50.0),   # 50.000 Hz → 50000
     }
 
-    server_ctx, stores, lock = build_tcp_server_context(
+    server_ctx, stores = build_tcp_server_context(
         hr_size=0, ir_size=10,
         hr_init=None, ir_init=ir_init,
         slave_id=0,
@@ -52,13 +46,27 @@ def run_transducer_server(
     ctrl_thread, ctrl_stop = start_transducer_controller(
         device_name=device_name,
         stores=stores,
-        lock=lock,
         tick_interval_s=tick_interval_s,
     )
-    log.info(f"{device_name} controller thread started (tick={tick_interval_s}s)")
+    log.info("%s controller thread started (tick=%ss)", device_name, tick_interval_s)
+
+    log.info("%s TCP server listening on %s:%s", device_name, host, port)
+    await serve_tcp(server_ctx, (host, port))
 
-    log.info(f"{device_name} TCP server listening on {host}:{port}")
-    StartTcpServer(server_ctx, address=(host, port))
+
+def run_transducer_server(
+    device_name: str,
+    host: str,
+    port: int,
+    tick_interval_s: float = 0.1,
+) -> None:
+    """Blocking entry point: serve_transducer_server on its own event loop."""
+    run_event_loop(serve_transducer_server(
+        device_name=device_name,
+        host=host,
+        port=port,
+        tick_interval_s=tick_interval_s,
+    ))
 
 
 if __name__ == "__main__":
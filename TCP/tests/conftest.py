@@ -0,0 +1,28 @@
+"""Shared fixtures for the Modbus TCP tests."""
+
+import socket
+
+import pytest
+
+from tcp_servers.tcp_context import build_tcp_server_context
+
+HOST = "127.0.0.1"
+
+
+@pytest.fixture
+def address():
+    """(host, port) of a currently free localhost TCP port."""
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()
+
+
+@pytest.fixture
+def device_context():
+    """(server_context, stores) for unit 1 with 4 HR + 4 IR registers:
+    HR [11, 0, 0, 0xFFFF], IR [21, 22, 23, 0]."""
+    return build_tcp_server_context(
+        hr_size=4, ir_size=4,
+        hr_init={0: 11, 3: 0xFFFF}, ir_init={0: 21, 1: 22, 2: 23},
+        slave_id=1,
+    )
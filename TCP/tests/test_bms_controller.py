@@ -0,0 +1,47 @@
+"""BMS controller's PCS reader task."""
+
+import asyncio
+
+import pytest
+
+from controllers.bms_controller import PCS_IR_ACTIVE_POWER, _pcs_reader
+from tcp_servers.register_codec import encode_i32
+
+
+class _OneShotClient:
+    """Answers one read with ``result`` (raised if an exception), then stops the reader."""
+
+    def __init__(self, result, stop_event):
+        self.result = result
+        self.stop_event = stop_event
+        self.closed = False
+
+    async def read_input_registers(self, address, count=1):
+        assert (address, count) == (PCS_IR_ACTIVE_POWER, 2)
+        self.stop_event.set()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+    def close(self):
+        self.closed = True
+
+
+def _poll_once(result):
+    stop_event = asyncio.Event()
+    client = _OneShotClient(result, stop_event)
+    latest = {"active_power_kw": 42.0}
+    asyncio.run(_pcs_reader("BMS1", client, latest, 0.0, stop_event))
+    return latest["active_power_kw"], client.closed
+
+
+def test_reader_publishes_power():
+    assert _poll_once(encode_i32(-12.5, gain=1000)) == (-12.5, False)
+
+
+@pytest.mark.parametrize("result, closed", [
+    (None, False),                      # Modbus exception response
+    (ConnectionError("reset"), True),   # I/O failure: reconnect next poll
+])
+def test_reader_failures_publish_zero(result, closed):
+    assert _poll_once(result) == (0.0, closed)
@@ -0,0 +1,106 @@
+"""FastModbusClient framing and the FastReadTcpServer FC03/FC04 path."""
+
+import asyncio
+import contextlib
+
+import pytest
+from pymodbus.client import AsyncModbusTcpClient
+from pymodbus.server import ModbusTcpServer
+
+from tcp_servers.fast_modbus import FastModbusClient, FastReadTcpServer
+from tcp_servers.tcp_context import ArrayDataBlock, build_multirange_server_context
+
+
+@contextlib.asynccontextmanager
+async def _serving(server_cls, server_ctx, address):
+    server = server_cls(server_ctx, address=address)
+    await server.serve_forever(background=True)
+    try:
+        yield
+    finally:
+        await server.shutdown()
+
+
+def test_fast_server_round_trip_with_pymodbus_client(address, device_context):
+    async def main():
+        server_ctx, stores = device_context
+        async with _serving(FastReadTcpServer, server_ctx, address):
+            client = AsyncModbusTcpClient(address[0], port=address[1])
+            await client.connect()
+            try:
+                rr = await client.read_holding_registers(0, count=4, device_id=1)
+                assert rr.registers == [11, 0, 0, 0xFFFF]
+                rr = await client.read_input_registers(1, count=2, device_id=1)
+                assert rr.registers == [22, 23]
+                # Out of range: falls through to pymodbus's exception response
+                rr = await client.read_input_registers(3, count=2, device_id=1)
+                assert rr.isError()
+                # Writes go through pymodbus unchanged
+                await client.write_registers(1, [5, 6], device_id=1)
+                assert list(stores["hr"].getValues(0, 4)) == [11, 5, 6, 0xFFFF]
+            finally:
+                client.close()
+    asyncio.run(main())
+
+
+def test_fast_server_multirange_context(address):
+    async def main():
+        server_ctx, _ = build_multirange_server_context(
+            ir_ranges=[(32080, 2, {32080: 1, 32081: 0x86A0})], slave_id=1)
+        async with _serving(FastReadTcpServer, server_ctx, address):
+            client = AsyncModbusTcpClient(address[0], port=address[1])
+            await client.connect()
+            try:
+                rr = await client.read_input_registers(32080, count=2, device_id=1)
+                assert rr.registers == [1, 0x86A0]
+            finally:
+                client.close()
+    asyncio.run(main())
+
+
+class _LiveArrayBlock(ArrayDataBlock):
+    """Returns its backing array instead of a copy."""
+
+    def getValues(self, address, count=1):
+        return self.values
+
+
+def test_fast_server_does_not_mutate_returned_values(address, device_context):
+    async def main():
+        server_ctx, _ = device_context
+        block = _LiveArrayBlock(2, {0: 0x1234, 1: 0x00FF})
+        server_ctx[1].store["h"] = block
+        async with _serving(FastReadTcpServer, server_ctx, address):
+            client = FastModbusClient(*address, unit_id=1)
+            try:
+                for _ in range(2):
+                    assert await client.read_holding_registers(0, 2) == [0x1234, 0x00FF]
+                assert list(block.values) == [0x1234, 0x00FF]
+            finally:
+                client.close()
+    asyncio.run(main())
+
+
+def test_fast_client_against_pymodbus_server(address, device_context):
+    async def main():
+        server_ctx, _ = device_context
+        async with _serving(ModbusTcpServer, server_ctx, address):
+            client = FastModbusClient(*address, unit_id=1)
+            try:
+                assert await client.read_input_registers(0, 3) == [21, 22, 23]
+                assert await client.write_registers(1, [0x8000, 7]) is True
+                assert await client.read_holding_registers(0, 4) == [11, 0x8000, 7, 0xFFFF]
+                # Modbus exception responses surface as None / False
+                assert await client.read_input_registers(3, 2) is None
+                assert await client.write_registers(3, [1, 2]) is False
+                # ... and leave the connection usable
+                assert await client.read_input_registers(2, 1) == [23]
+            finally:
+                client.close()
+    asyncio.run(main())
+
+
+def test_fast_client_connect_error_raises(address):
+    client = FastModbusClient(*address, timeout_s=1.0)
+    with pytest.raises(OSError):
+        asyncio.run(client.read_input_registers(0, 1))
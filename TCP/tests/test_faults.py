@@ -0,0 +1,59 @@
+"""FaultInjector (faults.py)."""
+
+import pytest
+
+import faults
+from faults import FaultInjector
+
+
+def _no_draw(*args):
+    raise AssertionError("unexpected random draw")
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 260])
+def test_chunks_rejoin_non_empty(size):
+    data = (bytes(range(256)) * 2)[:size]
+    inj = FaultInjector(chunk_min=1, chunk_max=8)
+    for _ in range(200):
+        chunks = inj.chunk_bytes(data)
+        assert b"".join(chunks) == data
+        assert all(len(c) > 0 for c in chunks)
+        assert len(chunks) <= min(8, len(data))
+
+
+def test_chunk_count_capped_at_data_length():
+    inj = FaultInjector(chunk_min=50, chunk_max=60)
+    chunks = inj.chunk_bytes(b"abc")
+    assert [bytes(c) for c in chunks] == [b"a", b"b", b"c"]
+
+
+def test_chunking_disabled_returns_whole_buffer():
+    inj = FaultInjector()
+    inj._randint = _no_draw
+    assert [bytes(c) for c in inj.chunk_bytes(b"frame")] == [b"frame"]
+
+
+def test_zero_rates_never_draw():
+    inj = FaultInjector(drop_rate=0.0, close_rate=0.0)
+    inj._rand = _no_draw
+    assert not inj.should_drop()
+    assert not inj.should_close()
+
+
+def test_rate_one_always_fires():
+    inj = FaultInjector(drop_rate=1.0, close_rate=1.0)
+    assert inj.should_drop() and inj.should_close()
+
+
+def test_fixed_delay_draws_nothing(monkeypatch):
+    slept = []
+    monkeypatch.setattr(faults.time, "sleep", slept.append)
+    inj = FaultInjector(delay_ms_min=20, delay_ms_max=20)
+    inj._randint = _no_draw
+    inj.maybe_sleep()
+    assert slept == [0.02]
+
+
+def test_no_delay_does_not_sleep(monkeypatch):
+    monkeypatch.setattr(faults.time, "sleep", _no_draw)
+    FaultInjector().maybe_sleep()
@@ -0,0 +1,68 @@
+"""plant.load_config and its parsed-YAML cache."""
+
+import os
+
+import plant
+
+
+def _write(path, text, mtime=1_000_000_000):
+    path.write_text(text)
+    os.utime(path, (mtime, mtime))
+
+
+def test_yaml_cached_outside_config_dir(tmp_path, monkeypatch):
+    cache_home = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    cfg = config_dir / "plant.yaml"
+    _write(cfg, "tick: 1\n")
+
+    assert plant.load_config(str(cfg)) == {"tick": 1}
+    assert os.listdir(config_dir) == ["plant.yaml"]
+    assert len(os.listdir(cache_home / "modbus_plant")) == 1
+    assert plant.load_config(str(cfg)) == {"tick": 1}  # served from the cache
+
+
+def test_edit_with_same_mtime_misses_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    cfg = tmp_path / "plant.yaml"
+    _write(cfg, "tick: 1\n")
+    assert plant.load_config(str(cfg)) == {"tick": 1}
+    _write(cfg, "tick: 2\n")  # same size, same mtime
+    assert plant.load_config(str(cfg)) == {"tick": 2}
+
+
+def test_unwritable_cache_dir_still_loads(tmp_path, monkeypatch):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(blocker))
+    cfg = tmp_path / "plant.yaml"
+    _write(cfg, "hosts: [a, b]\n")
+    assert plant.load_config(str(cfg)) == {"hosts": ["a", "b"]}
+
+
+def test_json_config(tmp_path):
+    cfg = tmp_path / "plant.json"
+    cfg.write_text('{"tick": 3}')
+    assert plant.load_config(str(cfg)) == {"tick": 3}
+
+
+def test_int_keys_are_not_cached_as_strings(tmp_path, monkeypatch):
+    cache_home = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    cfg = tmp_path / "plant.yaml"
+    _write(cfg, "pairing: {1: 2}\n")
+    for _ in range(2):
+        assert plant.load_config(str(cfg)) == {"pairing": {1: 2}}
+    assert not cache_home.exists()
+
+
+def test_yaml_date_loads_and_is_not_cached(tmp_path, monkeypatch):
+    cache_home = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    cfg = tmp_path / "plant.yaml"
+    _write(cfg, "commissioned: 2024-01-02\n")
+    config = plant.load_config(str(cfg))
+    assert str(config["commissioned"]) == "2024-01-02"
+    assert not cache_home.exists()
@@ -0,0 +1,28 @@
+"""The blocking run_*_server wrappers mirror their serve_*_server coroutines."""
+
+import inspect
+
+import pytest
+
+from rtu_multimeter import multimeter_rtu_server
+from tcp_servers import (
+    bms_server,
+    pcs_server,
+    pms_server,
+    suppression_server,
+    transducer_server,
+)
+
+
+@pytest.mark.parametrize("module, name", [
+    (bms_server, "bms"),
+    (pcs_server, "pcs"),
+    (pms_server, "pms"),
+    (suppression_server, "suppression"),
+    (transducer_server, "transducer"),
+    (multimeter_rtu_server, "multimeter"),
+])
+def test_run_wrapper_signature_matches_coroutine(module, name):
+    run = inspect.signature(getattr(module, f"run_{name}_server"))
+    serve = inspect.signature(getattr(module, f"serve_{name}_server"))
+    assert run.parameters == serve.parameters
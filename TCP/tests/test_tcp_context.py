@@ -0,0 +1,91 @@
+"""Datablocks of tcp_servers.tcp_context."""
+
+import threading
+from array import array
+
+import pytest
+from pymodbus.constants import ExcCodes
+
+from tcp_servers.tcp_context import (
+    ArrayDataBlock,
+    MultiRangeDataBlock,
+    build_tcp_server_context,
+)
+
+
+@pytest.mark.parametrize("values", [[7, 8, 9], (7, 8, 9), array("H", [7, 8, 9])])
+def test_array_block_set_accepts_any_sequence(values):
+    block = ArrayDataBlock(5)
+    assert block.setValues(1, values) is None
+    assert list(block.getValues(0, 5)) == [0, 7, 8, 9, 0]
+
+
+def test_array_block_set_single_int():
+    block = ArrayDataBlock(3, {0: 1})
+    block.setValues(2, 42)
+    assert list(block.getValues(0, 3)) == [1, 0, 42]
+
+
+def test_array_block_bounds():
+    block = ArrayDataBlock(4)
+    assert block.getValues(3, 2) is ExcCodes.ILLEGAL_ADDRESS
+    assert block.getValues(-1, 1) is ExcCodes.ILLEGAL_ADDRESS
+    assert block.setValues(3, [1, 2]) is ExcCodes.ILLEGAL_ADDRESS
+    assert list(block.getValues(0, 4)) == [0, 0, 0, 0]
+
+
+def test_array_block_read_is_a_copy():
+    block = ArrayDataBlock(2, {0: 5, 1: 6})
+    snapshot = block.getValues(0, 2)
+    snapshot[0] = 99
+    assert list(block.getValues(0, 2)) == [5, 6]
+
+
+@pytest.mark.parametrize("values", [[3, 4], (3, 4), array("H", [3, 4])])
+def test_multirange_set_accepts_any_sequence(values):
+    block = MultiRangeDataBlock([(100, 4), (200, 2)])
+    assert block.setValues(101, values) is None
+    assert list(block.getValues(100, 4)) == [0, 3, 4, 0]
+
+
+def test_multirange_bounds():
+    block = MultiRangeDataBlock([(100, 4, {103: 1}), (104, 2)])
+    assert list(block.getValues(103, 1)) == [1]
+    # adjacent ranges are still separate islands
+    assert block.getValues(103, 2) is ExcCodes.ILLEGAL_ADDRESS
+    assert block.getValues(99, 1) is ExcCodes.ILLEGAL_ADDRESS
+    assert block.setValues(105, [1, 2]) is ExcCodes.ILLEGAL_ADDRESS
+
+
+@pytest.mark.parametrize("make_block", [
+    lambda: ArrayDataBlock(8),
+    lambda: MultiRangeDataBlock([(0, 8)]),
+])
+def test_multi_register_write_never_torn(make_block):
+    block = make_block()
+    stop = threading.Event()
+
+    def writer():
+        patterns = ([1] * 8, [2] * 8)
+        i = 0
+        while not stop.is_set():
+            block.setValues(0, patterns[i & 1])
+            i += 1
+
+    t = threading.Thread(target=writer)
+    t.start()
+    try:
+        for _ in range(20000):
+            assert len(set(block.getValues(0, 8))) == 1
+    finally:
+        stop.set()
+        t.join()
+
+
+def test_build_tcp_server_context():
+    server_ctx, stores = build_tcp_server_context(
+        hr_size=0, ir_size=4, ir_init={1: 50}, slave_id=3)
+    assert isinstance(stores["ir"], ArrayDataBlock)
+    server_ctx[3].setValues(4, 2, (60, 70))
+    assert list(server_ctx[3].getValues(4, 0, 4)) == [0, 50, 60, 70]
+    assert server_ctx[3].getValues(3, 0, 1) is ExcCodes.ILLEGAL_ADDRESS
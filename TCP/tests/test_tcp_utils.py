@@ -0,0 +1,102 @@
+"""serve_tcp and the in-process shortcut for FastModbusClient."""
+
+import asyncio
+import socket
+import time
+
+import pytest
+from pymodbus.client import AsyncModbusTcpClient
+
+from tcp_servers import fast_modbus, tcp_utils
+from tcp_servers.fast_modbus import FastModbusClient
+
+
+async def _wait_listening(address):
+    for _ in range(200):
+        try:
+            _, writer = await asyncio.open_connection(*address)
+        except OSError:
+            await asyncio.sleep(0.01)
+            continue
+        writer.close()
+        return
+    raise AssertionError(f"{address} never started listening")
+
+
+def test_local_shortcut_matches_tcp_path(address, device_context):
+    async def main():
+        server_ctx, _ = device_context
+        tcp_utils.serve_in_process.set(True)  # as Plant.serve_all does
+        task = asyncio.create_task(tcp_utils.serve_tcp(server_ctx, address))
+        await _wait_listening(address)
+        assert fast_modbus._LOCAL_SERVERS[address] is server_ctx
+
+        local = FastModbusClient(*address, unit_id=1)
+        remote = AsyncModbusTcpClient(address[0], port=address[1])
+        await remote.connect()
+        try:
+            assert await local.read_input_registers(0, 2) == [21, 22]
+            assert await local.write_registers(1, [7, 8]) is True
+            assert await local.read_holding_registers(1, 4) is None  # out of range
+            assert not local.connected  # never opened a socket
+
+            # The same context, seen over TCP
+            rr = await remote.read_holding_registers(0, count=4, device_id=1)
+            assert rr.registers == [11, 7, 8, 0xFFFF]
+            await remote.write_registers(0, [9], device_id=1)
+            assert await local.read_holding_registers(0, 1) == [9]
+
+            # A unit the context does not serve fails like a dead peer
+            with pytest.raises(ConnectionError):
+                await FastModbusClient(*address, unit_id=5).read_input_registers(0, 1)
+        finally:
+            remote.close()
+            task.cancel()
+            await task
+        assert address not in fast_modbus._LOCAL_SERVERS
+    asyncio.run(main())
+
+
+def test_failed_bind_never_registers(monkeypatch, device_context):
+    registered = []
+    monkeypatch.setattr(tcp_utils, "register_local_server",
+                        lambda address, ctx: registered.append(address))
+
+    async def main():
+        server_ctx, _ = device_context
+        tcp_utils.serve_in_process.set(True)
+        with socket.socket() as busy:
+            busy.bind(("127.0.0.1", 0))
+            busy.listen()
+            address = busy.getsockname()
+            with pytest.raises(RuntimeError):
+                await tcp_utils.serve_tcp(server_ctx, address)
+        assert registered == []
+    asyncio.run(main())
+
+
+def test_one_device_per_process_registers_nothing(address, device_context):
+    async def main():
+        server_ctx, _ = device_context
+        task = asyncio.create_task(tcp_utils.serve_tcp(server_ctx, address))
+        await _wait_listening(address)
+        try:
+            assert address not in fast_modbus._LOCAL_SERVERS
+            client = FastModbusClient(*address, unit_id=1)
+            assert await client.read_input_registers(0, 3) == [21, 22, 23]
+            assert client.connected  # went over TCP
+            client.close()
+        finally:
+            task.cancel()
+            await task
+    asyncio.run(main())
+
+
+def test_next_deadline_on_time_and_behind():
+    now = time.monotonic()
+    sleep_s, following = tcp_utils.next_deadline(now + 10.0, 1.0)
+    assert 9.0 < sleep_s <= 10.0 and following == now + 11.0
+
+    # Fell behind: no sleep, and the next deadline restarts from now
+    sleep_s, following = tcp_utils.next_deadline(now - 5.0, 1.0)
+    assert sleep_s == 0.0 and now + 1.0 <= following < now + 2.0
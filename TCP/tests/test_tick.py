@@ -0,0 +1,74 @@
+"""Legacy tick loop (tick.py) over the single-process server context."""
+
+from device import DeviceModel
+from modbus_tcp import create_server_context
+from tick import build_tick_plan, tick_once
+
+PMS, PCS1, PCS2, BMS1 = 1, 2, 3, 4
+
+
+def _plant(demand_kw):
+    _, stores = create_server_context()
+    stores[PMS]["hr"].setValues(0, [DeviceModel.encode_power_kw(demand_kw)])
+    return stores
+
+
+def _ir(stores, uid, addr, count=1):
+    return list(stores[uid]["ir"].getValues(addr, count))
+
+
+def test_tick_splits_demand_and_aggregates():
+    stores = _plant(100.0)
+    tick_once(build_tick_plan(stores), 1.0)
+    assert _ir(stores, PCS1, 0) == [500]  # 50.0 kW, scale 0.1
+    assert _ir(stores, PCS2, 0) == [500]
+    assert _ir(stores, PMS, 0, 4) == [1000, 50, 100, 2000]
+
+
+def test_steady_state_skips_writes():
+    stores = _plant(100.0)
+    plan = build_tick_plan(stores)
+    tick_once(plan, 1.0)
+
+    writes = []
+    block = stores[PCS1]["ir"]
+    set_values = block.setValues
+    block.setValues = lambda addr, values: writes.append(addr) or set_values(addr, values)
+    tick_once(plan, 1.0)
+    assert writes == []
+
+
+def test_rebuilt_plan_rewrites_externally_changed_registers():
+    stores = _plant(100.0)
+    tick_once(build_tick_plan(stores), 1.0)
+
+    # Another writer changes a register the old plan believes is current
+    stores[PCS1]["ir"].setValues(0, [0])
+    tick_once(build_tick_plan(stores), 1.0)
+    assert _ir(stores, PCS1, 0) == [500]
+
+
+def test_demand_change_flows_through():
+    stores = _plant(100.0)
+    plan = build_tick_plan(stores)
+    tick_once(plan, 1.0)
+    stores[PMS]["hr"].setValues(0, [DeviceModel.encode_power_kw(-40.0)])
+    tick_once(plan, 1.0)
+    assert _ir(stores, PCS1, 0) == [DeviceModel.encode_power_kw(-20.0)]
+    assert _ir(stores, PMS, 0) == [DeviceModel.encode_power_kw(-40.0)]
+
+
+def test_building_a_plan_leaves_other_plans_state_alone():
+    stores_a = _plant(100.0)
+    plan_a = build_tick_plan(stores_a)
+    dt_s = 21.6  # 50 kW on 100 kWh: -0.3 %SOC per tick
+    tick_once(plan_a, dt_s)
+    tick_once(plan_a, dt_s)
+
+    plan_b = build_tick_plan(_plant(0.0))
+    tick_once(plan_b, dt_s)
+    tick_once(plan_a, dt_s)  # keeps its float SOC, no reseed from the register
+
+    assert round(plan_a.soc[0], 6) == 49.1
+    assert plan_a.ticks[0] == 3 and plan_b.ticks[0] == 1
+    assert round(plan_b.soc[0], 6) == 50.0
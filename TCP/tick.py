@@ -13,25 +13,26 @@ Addressing:
     (see modbus_tcp.py), so tick code simply uses addr 0, 1, 2, ... directly.
 
 Threading:
-    A shared threading.RLock (created in modbus_tcp.create_server_context)
-    guards both individual register access (inside LockedDataBlock) and
-    the full tick batch (with lock: in tick_once).  RLock is reentrant,
-    so inner per-register calls don't deadlock with the outer batch lock.
+    Each unit's blocks carry their own Lock (see modbus_tcp.py), taken
+    per getValues/setValues call.  The tick holds no outer batch lock, so
+    Modbus reads of one device never wait on writes to another.  The
+    PMS aggregate is one contiguous run (one setValues), so it is
+    consistent on its own.
 """
 
 import logging
 import threading
 import time
+from array import array
+from typing import Dict, NamedTuple, Optional, Tuple
 
 from device import DeviceModel
 from devices_spec import DEVICES, PCS_TO_BMS
+from tcp_servers.tcp_utils import next_deadline as _next_deadline
 
 log = logging.getLogger(__name__)
 
-# Internal float state to avoid quantization loss on low-resolution registers.
-# Without this, SOC (scale=1 = integer) would never change when delta < 0.5 per tick.
-# { bms_uid: {"soc": float} }
-_float_state = {}
+STATIC_REFRESH_TICKS = 60
 
 # --- Register addresses
 PMS_HR0_DEMAND = 0
@@ -54,125 +55,219 @@ def _get_reg(block, addr):
     return block.getValues(addr, 1)[0]
 
 
-def _set_reg(block, addr, value_u16):
-    """Write one uint16 register to a datablock (0-based address)."""
-    block.setValues(addr, [value_u16])
+def _write_runs(block, updates):
+    """
+    Write {0-based addr: uint16} to a datablock with one setValues per
+    contiguous run of addresses, so each run takes the block lock once.
+    """
+    addrs = sorted(updates)
+    start = prev = addrs[0]
+    run = [updates[start]]
+    for addr in addrs[1:]:
+        if addr == prev + 1:
+            run.append(updates[addr])
+        else:
+            block.setValues(start, run)
+            start, run = addr, [updates[addr]]
+        prev = addr
+    block.setValues(start, run)
+
+
+# --- Tick plan ---
+
+class TickPlan(NamedTuple):
+    """
+    Datablocks the tick touches, resolved once from DEVICES / PCS_TO_BMS.
+
+    pcs: one (pcs_ir, bms_ir, bms_slot) triple per PCS, in DEVICES order;
+         bms_slot indexes the float state arrays.  bms_ir and bms_slot
+         are None for a PCS without a paired BMS.
+    last_written: {block: {addr: uint16}}, the last value tick_once wrote
+         to each register.  Only valid while tick_once is the sole writer
+         of these registers (true for IR blocks: clients cannot write
+         input registers); anything else writing them must use a fresh
+         plan, or the cache would suppress writes the block still needs.
+
+    The remaining fields are the plan's float state, one float64 per BMS
+    slot, kept to avoid quantization loss on low-resolution registers:
+    without it SOC (scale=1 = integer) would never change when delta < 0.5
+    per tick.  SOH and capacity change on hour timescales (or never), so
+    they are re-read from the registers only every STATIC_REFRESH_TICKS
+    ticks.  Only the plan's tick thread touches this state, so plain
+    element stores need no lock.
+    """
+    pms_hr: object
+    pms_ir: object
+    pcs: Tuple[Tuple[object, Optional[object], Optional[int]], ...]
+    last_written: Dict[object, Dict[int, int]]
+    soc: array           # SOC accumulator, %
+    soh: array           # SOH, %
+    cap_kwh: array       # capacity, kWh
+    soc_per_kws: array   # %SOC per kW·s, 0 without capacity
+    ticks: array         # array('q', [n]): ticks run so far; 0 = seed SOC
+
+
+def build_tick_plan(stores):
+    """
+    Build the TickPlan for {unit_id: {"hr": block, "ir": block}} stores,
+    with an empty write cache and one zeroed float-state slot per paired
+    BMS (seeded from the registers on the plan's first tick).
+    """
+    pms_uid = next(spec["unit_id"] for spec in DEVICES.values()
+                   if spec["device_type"] == "PMS")
+    pcs = []
+    n_bms = 0
+    for spec in DEVICES.values():
+        if spec["device_type"] != "PCS":
+            continue
+        bms_uid = PCS_TO_BMS.get(spec["unit_id"])
+        if bms_uid in stores:
+            pcs.append((stores[spec["unit_id"]]["ir"], stores[bms_uid]["ir"], n_bms))
+            n_bms += 1
+        else:
+            pcs.append((stores[spec["unit_id"]]["ir"], None, None))
+
+    zeros = bytes(8 * n_bms)
+    return TickPlan(pms_hr=stores[pms_uid]["hr"], pms_ir=stores[pms_uid]["ir"],
+                    pcs=tuple(pcs), last_written={},
+                    soc=array("d", zeros), soh=array("d", zeros),
+                    cap_kwh=array("d", zeros), soc_per_kws=array("d", zeros),
+                    ticks=array("q", [0]))
 
 
 # --- Tick logic ---
 
-def tick_once(stores, dt_s, lock):
+def tick_once(plan, dt_s):
     """
-    One tick of the simulation.  All register writes are wrapped in `lock`
-    so that a concurrent Modbus read never sees a half-updated batch.
+    One tick of the simulation over a TickPlan from build_tick_plan().
+    Register access is locked per unit inside the datablocks; see the
+    module docstring.
+
+    Register writes are collected per block in ``pending`` and flushed
+    at the end, one setValues per contiguous run.  Blocks whose staged
+    values all match plan.last_written are skipped, so a plant in steady
+    state takes no block locks at all.
     """
-    # Identify unit IDs by device type
-    pms_uid = next(spec["unit_id"] for spec in DEVICES.values()
-                   if spec["device_type"] == "PMS")
-    pcs_uids = [spec["unit_id"] for spec in DEVICES.values()
-                if spec["device_type"] == "PCS"]
-    num_pcs = len(pcs_uids)
-
-    with lock:
-        # --- 1) Read demand from PMS HR0 ---
-        pms_hr = stores[pms_uid]["hr"]
-        demand_u16 = _get_reg(pms_hr, PMS_HR0_DEMAND)
-        demand_kw = DeviceModel.decode_power_kw(demand_u16)
-
-        # --- 2) Split demand equally to each PCS ---
-        per_pcs_kw = demand_kw / num_pcs if num_pcs > 0 else 0.0
-
-        total_active_power_kw = 0.0
-        soc_sum = 0.0
-        soh_sum = 0.0
-        cap_sum_kwh = 0.0
-        bms_count = 0
-
-        for pcs_uid in pcs_uids:
-            pcs_ir = stores[pcs_uid]["ir"]
-
-            # Write PCS active_power
-            _set_reg(pcs_ir, PCS_IR0_ACTIVE_POWER,
-                     DeviceModel.encode_power_kw(per_pcs_kw))
-            total_active_power_kw += per_pcs_kw
-
-            # --- 3) Update paired BMS SOC ---
-            bms_uid = PCS_TO_BMS.get(pcs_uid)
-            if bms_uid is None or bms_uid not in stores:
-                continue
-
-            bms_ir = stores[bms_uid]["ir"]
-
-            # Read current BMS values
-            soc_now = DeviceModel.decode_soc(_get_reg(bms_ir, BMS_IR0_SOC))
-            soh_now = DeviceModel.decode_soh(_get_reg(bms_ir, BMS_IR1_SOH))
-            cap_kwh = DeviceModel.decode_capacity_kwh(
-                _get_reg(bms_ir, BMS_IR2_CAPACITY))
-
-            # Initialise float accumulator on first tick (avoids quantization loss)
-            if bms_uid not in _float_state:
-                _float_state[bms_uid] = {"soc": soc_now}
-
-            soc_float = _float_state[bms_uid]["soc"]
-
-            # SOC delta: ΔSoc(%) = -(power_kW × Δt_s) / (capacity_kWh × 3600) × 100
-            #   power > 0 (discharge) => SOC decreases
-            #   power < 0 (charge)    => SOC increases
-            if cap_kwh > 0:
-                delta_soc = -(per_pcs_kw * dt_s) / (cap_kwh * 3600) * 100.0
-                soc_float = max(0.0, min(100.0, soc_float + delta_soc))
-            
-            _float_state[bms_uid]["soc"] = soc_float
-            _set_reg(bms_ir, BMS_IR0_SOC, DeviceModel.encode_soc(soc_float))
-
-            # Accumulate for PMS aggregate
-            soc_sum += soc_float
-            soh_sum += soh_now
-            cap_sum_kwh += cap_kwh
-            bms_count += 1
-
-        # --- 4) Aggregate PMS IR registers ---
-        pms_ir = stores[pms_uid]["ir"]
-        _set_reg(pms_ir, PMS_IR0_TOTAL_POWER,
-                 DeviceModel.encode_power_kw(total_active_power_kw))
-
-        if bms_count > 0:
-            _set_reg(pms_ir, PMS_IR1_SOC_AVG,
-                     DeviceModel.encode_soc(soc_sum / bms_count))
-            _set_reg(pms_ir, PMS_IR2_SOH_AVG,
-                     DeviceModel.encode_soh(soh_sum / bms_count))
-
-        _set_reg(pms_ir, PMS_IR3_CAP_TOTAL,
-                 DeviceModel.encode_capacity_kwh(cap_sum_kwh))
+    num_pcs = len(plan.pcs)
+    # Slow path, every STATIC_REFRESH_TICKS: one 3-register block read per
+    # BMS of SOC + SOH + capacity.  SOC is only taken on the first tick, to
+    # seed the float accumulator (avoids quantization loss).
+    ticks = plan.ticks[0]
+    refresh = ticks % STATIC_REFRESH_TICKS == 0
+    seed = ticks == 0
+    plan.ticks[0] = ticks + 1
+
+    # --- 1) Read demand from PMS HR0 ---
+    demand_u16 = _get_reg(plan.pms_hr, PMS_HR0_DEMAND)
+    demand_kw = DeviceModel.decode_power_kw(demand_u16)
+
+    # --- 2) Split demand equally to each PCS ---
+    per_pcs_kw = demand_kw / num_pcs if num_pcs > 0 else 0.0
+
+    # Every PCS gets the same share: encode it once, not once per PCS
+    per_pcs_u16 = DeviceModel.encode_power_kw(per_pcs_kw)
+    total_active_power_kw = per_pcs_kw * num_pcs
+
+    # Every paired BMS sees the same power and dt, so the energy term
+    # (kW·s) is shared; per BMS only the %SOC-per-kW·s factor differs.
+    # SOC delta: ΔSoc(%) = -(power_kW × Δt_s) / (capacity_kWh × 3600) × 100
+    #   power > 0 (discharge) => SOC decreases
+    #   power < 0 (charge)    => SOC increases
+    energy_kws = per_pcs_kw * dt_s
+
+    soc_state, soh_state = plan.soc, plan.soh
+    cap_state, soc_per_kws = plan.cap_kwh, plan.soc_per_kws
+    soc_sum = 0.0
+    soh_sum = 0.0
+    cap_sum_kwh = 0.0
+    bms_count = 0
+    pending = {}  # {block: {addr: uint16}}
+
+    for pcs_ir, bms_ir, slot in plan.pcs:
+        # Write PCS active_power
+        pending.setdefault(pcs_ir, {})[PCS_IR0_ACTIVE_POWER] = per_pcs_u16
+
+        # --- 3) Update paired BMS SOC ---
+        if bms_ir is None:
+            continue
+
+        if refresh:
+            soc_u16, soh_u16, cap_u16 = bms_ir.getValues(BMS_IR0_SOC, 3)
+            if seed:
+                soc_state[slot] = DeviceModel.decode_soc(soc_u16)
+            soh_state[slot] = DeviceModel.decode_soh(soh_u16)
+            cap_state[slot] = cap_kwh = DeviceModel.decode_capacity_kwh(cap_u16)
+            # %SOC per kW·s, folded once per refresh instead of every tick
+            soc_per_kws[slot] = 100.0 / (cap_kwh * 3600) if cap_kwh > 0 else 0.0
+
+        # soc_per_kws is 0 without capacity, so SOC then stays put
+        soc_float = soc_state[slot] - energy_kws * soc_per_kws[slot]
+        soc_float = soc_state[slot] = max(0.0, min(100.0, soc_float))
+        pending.setdefault(bms_ir, {})[BMS_IR0_SOC] = \
+            DeviceModel.encode_soc(soc_float)
+
+        # Accumulate for PMS aggregate
+        soc_sum += soc_float
+        soh_sum += soh_state[slot]
+        cap_sum_kwh += cap_state[slot]
+        bms_count += 1
+
+    # --- 4) Aggregate PMS IR registers ---
+    # IR0..IR3 are contiguous, so they flush as one setValues(0, [4 regs]).
+    # Without any paired BMS, SOC/SOH averages keep their last value.
+    pms_ir = plan.pms_ir
+    if bms_count > 0:
+        soc_u16 = DeviceModel.encode_soc(soc_sum / bms_count)
+        soh_u16 = DeviceModel.encode_soh(soh_sum / bms_count)
+    else:
+        soc_u16, soh_u16 = pms_ir.getValues(PMS_IR1_SOC_AVG, 2)
+    pending.setdefault(pms_ir, {}).update({
+        PMS_IR0_TOTAL_POWER: DeviceModel.encode_power_kw(total_active_power_kw),
+        PMS_IR1_SOC_AVG: soc_u16,
+        PMS_IR2_SOH_AVG: soh_u16,
+        PMS_IR3_CAP_TOTAL: DeviceModel.encode_capacity_kwh(cap_sum_kwh),
+    })
+
+    # --- 5) Flush ---
+    # A block is skipped only if none of its registers changed; otherwise
+    # all of its staged registers are rewritten, so a multi-register group
+    # (the PMS aggregate) always lands in one atomic run, never torn.
+    for block, updates in pending.items():
+        last = plan.last_written.setdefault(block, {})
+        if any(last.get(addr) != u16 for addr, u16 in updates.items()):
+            _write_runs(block, updates)
+            last.update(updates)
 
 
 # --- Background thread ---
 
-def _tick_loop(stores, interval, lock, stop_event):
-    """Background loop: calls tick_once() every `interval` seconds."""
-    log.info(f"Tick loop running, interval={interval}s")
-    last = time.monotonic()
+def _tick_loop(plan, interval, stop_event):
+    """
+    Background loop: calls tick_once() every `interval` seconds.
 
-    while not stop_event.is_set():
-        now = time.monotonic()
-        dt_s = now - last
-        last = now
+    dt is the nominal interval, so the SOC trajectory does not depend on
+    scheduling jitter; ticks are paced by tcp_utils.next_deadline.
+    """
+    log.info("Tick loop running, interval=%ss", interval)
+    next_deadline = time.monotonic() + interval
 
+    while not stop_event.is_set():
         try:
-            tick_once(stores, dt_s, lock)
+            tick_once(plan, interval)
         except Exception:
             log.exception("Tick error")
 
-        stop_event.wait(interval)
+        sleep_s, next_deadline = _next_deadline(next_deadline, interval)
+        stop_event.wait(sleep_s)
 
 
-def start_tick_loop(stores, lock, interval=1.0):
+def start_tick_loop(plan, interval=1.0):
     """
     Start tick loop in a daemon thread.
 
     Args:
-        stores: {unit_id: {"hr": block, "ir": block}} from create_server_context.
-        lock:   shared threading.RLock from create_server_context.
+        plan: TickPlan from build_tick_plan(stores), where stores is the
+              {unit_id: {"hr": block, "ir": block}} from create_server_context.
         interval: seconds between ticks (default 1.0).
 
     Returns:
@@ -182,7 +277,7 @@ def start_tick_loop(stores, lock, interval=1.0):
     stop_event = threading.Event()
     t = threading.Thread(
         target=_tick_loop,
-        args=(stores, interval, lock, stop_event),
+        args=(plan, interval, stop_event),
         daemon=True,
     )
     t.start()